@@ -0,0 +1,108 @@
+"""
+Numba-ядра для агрегации свечей по торговым сессиям.
+
+numba - опциональная зависимость. Если она не установлена, NUMBA_AVAILABLE = False,
+а SessionAnalyzer использует векторный путь через NumPy.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Заглушка для njit без numba: возвращает функцию без изменений."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Коды тренда, которые возвращают ядра; индекс в TREND_LABELS
+TREND_BULLISH = 0
+TREND_BEARISH = 1
+TREND_FLAT = 2
+TREND_LABELS = np.array(['bullish', 'bearish', 'flat'], dtype=object)
+
+
+@njit(cache=True, parallel=True)
+def session_day_stats(lo, hi, open_, high, low, close, volume):
+    """
+    Характеристики сессии для каждого дня прямо по отрезкам [lo[d], hi[d]) исходных массивов свечей,
+    без копирования свечей сессии в промежуточный массив. Дни обрабатываются параллельно.
+
+    Пропуски (NaN) в High/Low/Volume игнорируются, как в pandas max/min/sum;
+    свеча с NaN в Open или Close не считается ни бычьей, ни медвежьей, ни нейтральной.
+
+    Args:
+        lo, hi: int64 массивы границ непустых отрезков свечей каждого дня.
+        open_, high, low, close: массивы цен float64 (или float32).
+        volume: Массив объемов (целочисленный или float).
+
+    Returns:
+        Кортеж (opens, closes, highs, lows, trend_codes, bullish, bearish, neutral, volumes) длины len(lo).
+    """
+    n_days = lo.shape[0]
+    opens = np.empty(n_days, dtype=np.float64)
+    closes = np.empty(n_days, dtype=np.float64)
+    highs = np.empty(n_days, dtype=np.float64)
+    lows = np.empty(n_days, dtype=np.float64)
+    trend_codes = np.empty(n_days, dtype=np.int8)
+    bullish = np.zeros(n_days, dtype=np.int64)
+    bearish = np.zeros(n_days, dtype=np.int64)
+    neutral = np.zeros(n_days, dtype=np.int64)
+    volumes = np.zeros(n_days, dtype=volume.dtype)
+
+    for d in prange(n_days):
+        start = lo[d]
+        end = hi[d]
+        day_high = np.nan
+        day_low = np.nan
+        for i in range(start, end):
+            if high[i] > day_high or day_high != day_high:
+                day_high = high[i]
+            if low[i] < day_low or day_low != day_low:
+                day_low = low[i]
+            diff = close[i] - open_[i]
+            if diff > 0:
+                bullish[d] += 1
+            elif diff < 0:
+                bearish[d] += 1
+            elif diff == 0:
+                neutral[d] += 1
+            if volume[i] == volume[i]:
+                volumes[d] += volume[i]
+
+        opens[d] = open_[start]
+        closes[d] = close[end - 1]
+        highs[d] = day_high
+        lows[d] = day_low
+        if closes[d] > opens[d]:
+            trend_codes[d] = TREND_BULLISH
+        elif closes[d] < opens[d]:
+            trend_codes[d] = TREND_BEARISH
+        else:
+            trend_codes[d] = TREND_FLAT
+
+    return opens, closes, highs, lows, trend_codes, bullish, bearish, neutral, volumes
+
+
+def count_candles_per_day(open_, close, day_ids, n_days):
+    """
+    NumPy-вариант подсчета бычьих/медвежьих/нейтральных свечей по дням для окружения без numba:
+    тип свечи кодируется по знаку Close - Open, счетчики всех дней и типов считаются одним np.bincount.
+
+    Args:
+        open_, close: Массивы цен свечей.
+        day_ids: Номер дня (0..n_days-1) для каждой свечи.
+        n_days: Количество дней.
+
+    Returns:
+        Кортеж (bullish, bearish, neutral) int64 массивов длины n_days.
+    """
+    sign = np.sign(close - open_)
+    # 0 - бычья, 1 - нейтральная, 2 - медвежья, 3 - NaN в цене (не учитывается)
+    candle_kind = np.where(np.isnan(sign), 3, 1 - sign).astype(np.int64)
+    counts = np.bincount(day_ids * 4 + candle_kind, minlength=n_days * 4).reshape(n_days, 4)
+    return counts[:, 0], counts[:, 2], counts[:, 1]
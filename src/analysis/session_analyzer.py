@@ -1,22 +1,231 @@
+import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, time, date
+from functools import partial
 import pytz # Добавим pytz для работы с часовыми поясами
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
-from src.core.trading_sessions import SessionDefinition, get_utc_session_boundaries_for_date
+from src.core.trading_sessions import SessionDefinition, get_utc_session_boundaries_for_range
+from src.analysis._session_kernels import (
+    NUMBA_AVAILABLE, TREND_BULLISH, TREND_BEARISH, TREND_FLAT, TREND_LABELS,
+    count_candles_per_day, session_day_stats
+)
 from src.core.data_manager import DataManager # Может понадобиться для получения данных
 from src.data_ingestion.yahoo_finance_connector import YahooFinanceConnector # Для примера
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Единственный объект UTC, с которым сравниваем tz индекса по идентичности
+_UTC = pytz.UTC
+
+# Колонки свечей, которые нужны анализатору; остальные колонки кэша с диска не читаются
+MARKET_DATA_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+# Сколько последних наборов рыночных данных SessionAnalyzer держит в памяти
+DEFAULT_MARKET_DATA_CACHE_SIZE = 8
+
+
+def _price_array(series: pd.Series) -> np.ndarray:
+    """
+    Массив цен для numba-ядра: float32-колонки (DataManager с price_dtype='float32') передаются без
+    копирования, остальные приводятся к float64.
+    """
+    if series.dtype == np.float32:
+        return series.to_numpy()
+    return series.to_numpy(dtype=np.float64, copy=False)
+
+
+def _utc_session_boundaries_for_days(
+    session_def: SessionDefinition,
+    days: pd.DatetimeIndex
+) -> tuple[pd.DatetimeIndex, pd.DatetimeIndex, pd.DatetimeIndex]:
+    """
+    Границы сессии в UTC для диапазона дней (через get_utc_session_boundaries_for_range)
+    без дней, на которые граница сессии попадает в переход DST.
+
+    Args:
+        session_def: Определение сессии (SessionDefinition).
+        days: Наивный DatetimeIndex с полуночами дат, для которых рассчитываются границы.
+
+    Returns:
+        Кортеж (session_days, starts_utc, ends_utc): даты сессий и их границы в UTC. Дни, где время
+        открытия/закрытия неоднозначно или не существует из-за перехода DST, пропускаются (как и в прежнем цикле).
+    """
+    starts_utc, ends_utc = get_utc_session_boundaries_for_range(session_def, days)
+
+    invalid = starts_utc.isna() | ends_utc.isna()
+    if invalid.any():
+        for skipped_day in days[invalid].date:
+            logger.warning("Ambiguous or non-existent time for session %s on %s due to DST. Skipping day.", session_def.name, skipped_day)
+        days = days[~invalid]
+        starts_utc = starts_utc[~invalid]
+        ends_utc = ends_utc[~invalid]
+
+    return days, starts_utc, ends_utc
+
+
+def _positions_from_bounds(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """
+    Склеивает полуинтервалы позиций [lo[i], hi[i]) в один массив без цикла по дням:
+    np.repeat сдвигов + один np.arange на общую длину.
+    """
+    lengths = np.maximum(hi - lo, 0)
+    segment_offsets = lo - (np.cumsum(lengths) - lengths)
+    return np.repeat(segment_offsets, lengths) + np.arange(lengths.sum())
+
+
+def _session_day_bounds(
+    index_ns: np.ndarray,
+    session_def: SessionDefinition,
+    start_date: date,
+    end_date: date
+) -> tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+    """
+    Находит для каждого дня периода отрезок свечей сессии [lo, hi) в отсортированном индексе.
+    Обе границы сессии включаются, как в прежнем фильтре (index >= start) & (index <= end).
+
+    Args:
+        index_ns: Отсортированный индекс рыночных данных как int64 наносекунды UTC.
+        session_def: Определение сессии (SessionDefinition).
+        start_date: Первая дата периода (включительно).
+        end_date: Последняя дата периода (включительно).
+
+    Returns:
+        Кортеж (session_days, lo, hi) только для дней, в которых есть хотя бы одна свеча сессии.
+    """
+    # Все даты периода строятся одним pd.date_range, без пошагового прибавления дня в цикле
+    days = pd.date_range(start_date, end_date, freq='D')
+    session_days, starts_utc, ends_utc = _utc_session_boundaries_for_days(session_def, days)
+    lo = np.searchsorted(index_ns, starts_utc.as_unit('ns').asi8, side='left')
+    hi = np.searchsorted(index_ns, ends_utc.as_unit('ns').asi8, side='right')
+    has_candles = hi > lo
+
+    if logger.isEnabledFor(logging.DEBUG):
+        for session_day, start_utc, end_utc, n_candles in zip(session_days.date, starts_utc, ends_utc, hi - lo):
+            logger.debug("For date %s, session '%s' UTC boundaries: %s - %s, %d candles.",
+                         session_day, session_def.name, start_utc, end_utc, n_candles)
+
+    return session_days[has_candles], lo[has_candles], hi[has_candles]
+
+
+class SessionView:
+    """
+    Легковесное представление свечей сессии без копирования данных: родительский DataFrame
+    и отрезки строк [lo, hi) для каждого дня сессии.
+
+    view['Open'] возвращает NumPy массив значений колонки только для свечей сессии;
+    to_frame() материализует обычный DataFrame (как get_session_data).
+    """
+
+    def __init__(self, parent: pd.DataFrame, session_days: pd.DatetimeIndex, lo: np.ndarray, hi: np.ndarray):
+        self.parent = parent
+        self.session_days = session_days
+        self.lo = lo
+        self.hi = hi
+        self._positions: Optional[np.ndarray] = None
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Возрастающие позиции свечей сессии в parent (вычисляются один раз)."""
+        if self._positions is None:
+            self._positions = _positions_from_bounds(self.lo, self.hi)
+        return self._positions
+
+    def __len__(self) -> int:
+        return int((self.hi - self.lo).sum())
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.parent[column].to_numpy()[self.positions]
+
+    def to_frame(self) -> pd.DataFrame:
+        return self.parent.take(self.positions)
+
+
 class SessionAnalyzer:
     """
     Анализирует рыночные данные в контексте определенных торговых сессий.
     """
 
-    def __init__(self, data_manager: DataManager):
+    def __init__(self, data_manager: DataManager, market_data_cache_size: int = DEFAULT_MARKET_DATA_CACHE_SIZE):
+        """
+        Args:
+            data_manager: DataManager для загрузки рыночных данных.
+            market_data_cache_size: Сколько последних наборов рыночных данных (символ, интервал, период)
+                                    держать в памяти, чтобы анализ нескольких сессий одного символа не обращался
+                                    к DataManager повторно. 0 - отключить.
+        """
         self.data_manager = data_manager
+        self.market_data_cache_size = market_data_cache_size
+        # LRU рыночных данных: (symbol, interval, start, end) -> (DataFrame с отсортированным UTC индексом,
+        # тот же индекс как int64 наносекунды). Возвращаемые кэшем DataFrame общие, вызывающий код не должен их изменять.
+        self._market_data_cache: "OrderedDict[tuple, Tuple[pd.DataFrame, np.ndarray]]" = OrderedDict()
+
+    def clear_market_data_cache(self, symbol: Optional[str] = None) -> None:
+        """
+        Очищает кэш рыночных данных в памяти: целиком или только для symbol.
+        Нужен после обновления данных в DataManager (например, get_data с force_refresh=True),
+        чтобы следующий анализ прочитал их заново.
+        """
+        if symbol is None:
+            self._market_data_cache.clear()
+            return
+        for cache_key in [key for key in self._market_data_cache if key[0] == symbol]:
+            del self._market_data_cache[cache_key]
+
+    def _get_market_data(
+        self,
+        symbol: str,
+        start_date_dt: datetime,
+        end_date_dt: datetime,
+        data_interval: str
+    ) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        Возвращает рыночные данные с отсортированным DatetimeIndex в UTC, используя кэш в памяти.
+
+        Returns:
+            Кортеж (market_data, index_ns), где index_ns - индекс market_data как int64 наносекунды UTC.
+            Все сравнения с границами сессий выполняются по index_ns, tz-aware индекс нужен только в результате.
+        """
+        cache_key = (symbol, data_interval, start_date_dt.date().isoformat(), end_date_dt.date().isoformat())
+        cached = self._market_data_cache.get(cache_key)
+        if cached is not None:
+            self._market_data_cache.move_to_end(cache_key)
+            logger.debug("Using in-memory market data for %s (%s, %s - %s).", symbol, data_interval, cache_key[2], cache_key[3])
+            return cached
+
+        logger.info(f"Fetching raw data for {symbol} from {start_date_dt.date()} to {end_date_dt.date()} with interval {data_interval}.")
+        market_data = self.data_manager.get_data(
+            symbol, start_date_dt, end_date_dt, interval=data_interval, columns=MARKET_DATA_COLUMNS
+        )
+
+        if market_data.empty:
+            return market_data, np.empty(0, dtype=np.int64)
+
+        # В UTC нет переходов DST, поэтому ambiguous='infer' (лишний проход по индексу) не нужен.
+        # Индекс, уже находящийся в UTC (pytz.UTC, datetime.timezone.utc или ZoneInfo('UTC')
+        # после чтения parquet), не конвертируется: index_ns от этого не зависит.
+        index_tz = market_data.index.tz
+        if index_tz is None:
+            logger.debug("Localizing naive DatetimeIndex for %s to UTC.", symbol)
+            market_data.index = market_data.index.tz_localize(_UTC)
+        elif index_tz is not _UTC and str(index_tz) != 'UTC':
+            logger.debug("Converting DatetimeIndex for %s to UTC from %s.", symbol, market_data.index.tz)
+            market_data.index = market_data.index.tz_convert(_UTC)
+
+        # Инвариант кэша: индекс отсортирован по возрастанию - на нем держатся searchsorted по index_ns
+        # и отсутствие sort_index() в результатах. yfinance и parquet-кэш отдают данные отсортированными,
+        # и is_monotonic_increasing (кэшируется pandas) тогда обходится без сортировки.
+        if not market_data.index.is_monotonic_increasing:
+            market_data = market_data.sort_index()
+
+        index_ns = market_data.index.as_unit('ns').asi8
+        if self.market_data_cache_size > 0:
+            self._market_data_cache[cache_key] = (market_data, index_ns)
+            while len(self._market_data_cache) > self.market_data_cache_size:
+                self._market_data_cache.popitem(last=False)
+        return market_data, index_ns
 
     def get_session_data(
         self,
@@ -29,73 +238,56 @@ class SessionAnalyzer:
         """
         Извлекает данные для указанной торговой сессии за определенный период,
         корректно обрабатывая DST для сессий, определенных в локальных часовых поясах.
+        Результат уже отсортирован по времени, вызывать sort_index() не нужно.
         """
-        logger.info(f"Fetching raw data for {symbol} from {start_date_dt.date()} to {end_date_dt.date()} with interval {data_interval}.")
-        market_data = self.data_manager.get_data(symbol, start_date_dt, end_date_dt, interval=data_interval)
+        session_view = self.get_session_view(symbol, session_def, start_date_dt, end_date_dt, data_interval)
+        return self._session_data_from_view(symbol, session_def, session_view)
 
-        if market_data.empty:
-            logger.warning(f"No market data found for {symbol} to analyze session {session_def.name}.")
+    def _session_data_from_view(self, symbol: str, session_def: SessionDefinition, session_view: SessionView) -> pd.DataFrame:
+        """Копирует свечи сессии из SessionView в DataFrame (общая часть get_session_data и get_session_data_multi)."""
+        if session_view.parent.empty:
             return pd.DataFrame()
 
-        if market_data.index.tz is None:
-            logger.debug(f"Localizing naive DatetimeIndex for {symbol} to UTC.")
-            market_data.index = market_data.index.tz_localize('UTC', ambiguous='infer')
-        elif market_data.index.tz != pytz.UTC:
-            logger.debug(f"Converting DatetimeIndex for {symbol} to UTC from {market_data.index.tz}.")
-            market_data.index = market_data.index.tz_convert(pytz.UTC)
-        
-        # Если сессия определена напрямую в UTC, старая логика с between_time может быть эффективнее
-        # Но для универсальности и точности с DST, будем итерировать по дням и использовать datetime границы.
-        # Это может быть менее производительно для очень больших диапазонов и UTC-определенных сессий.
-        if session_def.exchange_timezone == "UTC":
-            # Можно использовать старую, более быструю логику для UTC-сессий, если производительность станет проблемой.
-            # Пока оставим универсальный подход.
-            logger.info(f"Session {session_def.name} is defined in UTC. Using daily boundary calculation for consistency.")
-
-        all_session_candles = []
-        current_date = start_date_dt.date()
-        while current_date <= end_date_dt.date():
-            try:
-                # Получаем UTC границы для текущей даты
-                session_start_utc, session_end_utc = get_utc_session_boundaries_for_date(session_def, current_date)
-                logger.debug(f"For date {current_date}, session '{session_def.name}' UTC boundaries: {session_start_utc} - {session_end_utc}")
-                
-                # Фильтруем данные для текущего дня по UTC datetime границам
-                # DataFrame.loc будет включать обе границы, если они точно совпадают с индексом.
-                # Если нужны строгие границы (>) и (<), нужно будет настроить.
-                # Для свечей, обычно включаем начальную и конечную свечу сессии.
-                # A[ (A.index >= S) & (A.index <= E) ]
-                daily_market_data = market_data[
-                    (market_data.index >= session_start_utc) & 
-                    (market_data.index <= session_end_utc)
-                ]
-                
-                if not daily_market_data.empty:
-                    all_session_candles.append(daily_market_data)
-                    logger.debug(f"  Found {len(daily_market_data)} candles for {session_def.name} on {current_date}.")
-                else:
-                    logger.debug(f"  No candles found for {session_def.name} on {current_date} within calculated UTC boundaries.")
-            
-            except pytz.exceptions.AmbiguousTimeError as ate:
-                logger.warning(f"Ambiguous time for session {session_def.name} on {current_date} due to DST: {ate}. Skipping day.")
-            except pytz.exceptions.NonExistentTimeError as nete:
-                logger.warning(f"Non-existent time for session {session_def.name} on {current_date} due to DST: {nete}. Skipping day.")
-            except Exception as e:
-                logger.error(f"Error processing session {session_def.name} for {current_date}: {e}. Skipping day.")
-            
-            current_date += pd.Timedelta(days=1)
-
-        if not all_session_candles:
+        if len(session_view) == 0:
             logger.warning(f"No data matched session {session_def.name} for {symbol} in the entire period.")
             return pd.DataFrame()
-            
-        result_df = pd.concat(all_session_candles)
-        if result_df.empty:
-            logger.warning(f"Resulting DataFrame for session {session_def.name} for {symbol} is empty after concatenation.")
-        else:
-            logger.info(f"Successfully extracted {len(result_df)} total candles for session {session_def.name} for {symbol}.")
-        
-        return result_df.sort_index()
+
+        result_df = session_view.to_frame()
+        logger.info(f"Successfully extracted {len(result_df)} total candles for session {session_def.name} for {symbol}.")
+        return result_df
+
+    def get_session_view(
+        self,
+        symbol: str,
+        session_def: SessionDefinition,
+        start_date_dt: datetime,
+        end_date_dt: datetime,
+        data_interval: str = "1h"
+    ) -> SessionView:
+        """
+        То же, что get_session_data, но без копирования свечей: возвращает SessionView
+        над закэшированными рыночными данными. Родительский DataFrame общий, изменять его нельзя.
+        """
+        market_data, idx_ns = self._get_market_data(symbol, start_date_dt, end_date_dt, data_interval)
+
+        if market_data.empty:
+            logger.warning(f"No market data found for {symbol} to analyze session {session_def.name}.")
+
+        return self._session_view(market_data, idx_ns, session_def, start_date_dt, end_date_dt)
+
+    @staticmethod
+    def _session_view(
+        market_data: pd.DataFrame,
+        idx_ns: np.ndarray,
+        session_def: SessionDefinition,
+        start_date_dt: datetime,
+        end_date_dt: datetime
+    ) -> SessionView:
+        """SessionView сессии над уже загруженными рыночными данными (результатом _get_market_data)."""
+        # Границы сессий для всех дней рассчитываются одной векторной локализацией,
+        # отрезки свечей находятся бинарным поиском по int64 индексу
+        session_days, lo, hi = _session_day_bounds(idx_ns, session_def, start_date_dt.date(), end_date_dt.date())
+        return SessionView(market_data, session_days, lo, hi)
 
     def analyze_session_details(
         self, 
@@ -127,11 +319,16 @@ class SessionAnalyzer:
             logger.warning(f"Not enough data to analyze details for session {session_definition.name}. Data has {len(session_data)} rows.")
             return None
 
+        # Работаем с NumPy массивами колонок: по одному проходу на каждую величину, без булевых срезов DataFrame.
+        # nanmax/nanmin/nansum пропускают NaN, как pandas max/min/sum.
+        open_arr = session_data['Open'].to_numpy()
+        close_arr = session_data['Close'].to_numpy()
+
         # Тренд по Open/Close сессии
-        open_price = session_data['Open'].iloc[0]
-        close_price = session_data['Close'].iloc[-1]
-        high_price = session_data['High'].max()
-        low_price = session_data['Low'].min()
+        open_price = open_arr[0]
+        close_price = close_arr[-1]
+        high_price = np.nanmax(session_data['High'].to_numpy())
+        low_price = np.nanmin(session_data['Low'].to_numpy())
         
         trend = "flat"
         if close_price > open_price:
@@ -139,17 +336,19 @@ class SessionAnalyzer:
         elif close_price < open_price:
             trend = "bearish"
 
-        # Подсчет типов свечей
-        bullish_candles = len(session_data[session_data['Close'] > session_data['Open']])
-        bearish_candles = len(session_data[session_data['Close'] < session_data['Open']])
-        neutral_candles = len(session_data[session_data['Close'] == session_data['Open']])
+        # Подсчет типов свечей по одной разности Close - Open
+        diff = close_arr - open_arr
+        bullish_candles = int((diff > 0).sum())
+        bearish_candles = int((diff < 0).sum())
+        neutral_candles = int((diff == 0).sum())
 
         # Общий объем
-        total_volume = session_data['Volume'].sum()
+        total_volume = np.nansum(session_data['Volume'].to_numpy())
 
         logger.debug(
-            f"Session {session_definition.name} details: Trend={trend}, O={open_price}, C={close_price}, H={high_price}, L={low_price}, "
-            f"Bullish={bullish_candles}, Bearish={bearish_candles}, Neutral={neutral_candles}, Volume={total_volume}"
+            "Session %s details: Trend=%s, O=%s, C=%s, H=%s, L=%s, Bullish=%s, Bearish=%s, Neutral=%s, Volume=%s",
+            session_definition.name, trend, open_price, close_price, high_price, low_price,
+            bullish_candles, bearish_candles, neutral_candles, total_volume
         )
 
         return {
@@ -179,44 +378,207 @@ class SessionAnalyzer:
             DataFrame с колонками, включающими 'Date', 'SessionName', 'Trend', 
             'SessionOpen', 'SessionClose', 'SessionHigh', 'SessionLow',
             'BullishCandles', 'BearishCandles', 'NeutralCandles', 'TotalVolume'.
+            'Trend' и 'SessionName' имеют тип category ('Trend': 'bullish', 'bearish', 'flat').
         """
-        all_session_data = self.get_session_data(symbol, session_definition, start_date_dt, end_date_dt, data_interval)
-        
-        if all_session_data.empty:
+        market_data, idx_ns = self._get_market_data(symbol, start_date_dt, end_date_dt, data_interval)
+        if market_data.empty:
+            logger.warning(f"No market data found for {symbol} to analyze session {session_definition.name}.")
+        return self._daily_session_analysis_from_data(
+            symbol, session_definition, market_data, idx_ns, start_date_dt, end_date_dt
+        )
+
+    def _daily_session_analysis_from_data(
+        self,
+        symbol: str,
+        session_definition: SessionDefinition,
+        market_data: pd.DataFrame,
+        idx_ns: np.ndarray,
+        start_date_dt: datetime,
+        end_date_dt: datetime
+    ) -> pd.DataFrame:
+        """
+        Дневной анализ сессии по уже загруженным рыночным данным (результату _get_market_data).
+        Общая часть get_daily_session_analysis и get_daily_session_analysis_multi; подклассы
+        с другим способом агрегации переопределяют этот метод.
+        """
+        session_view = self._session_view(market_data, idx_ns, session_definition, start_date_dt, end_date_dt)
+        session_days, lo, hi = session_view.session_days, session_view.lo, session_view.hi
+
+        if len(session_days) == 0:
             logger.warning(f"No session data to analyze daily characteristics for {symbol}, session {session_definition.name}.")
             return pd.DataFrame()
 
-        results = []
-        output_columns = [
-            'Date', 'SessionName', 'Trend', 'SessionOpen', 'SessionClose', 'SessionHigh', 'SessionLow',
-            'BullishCandles', 'BearishCandles', 'NeutralCandles', 'TotalVolume'
-        ]
-        
-        for day_date, daily_data_for_session in all_session_data.groupby(all_session_data.index.date):
-            if daily_data_for_session.empty:
-                continue
-            
-            analysis_results = self.analyze_session_details(daily_data_for_session, session_definition)
-            if analysis_results:
-                results.append({
-                    'Date': pd.to_datetime(day_date), 
-                    'SessionName': session_definition.name,
-                    'Trend': analysis_results['trend'],
-                    'SessionOpen': analysis_results['session_open'],
-                    'SessionClose': analysis_results['session_close'],
-                    'SessionHigh': analysis_results['session_high'],
-                    'SessionLow': analysis_results['session_low'],
-                    'BullishCandles': analysis_results['bullish_candles'],
-                    'BearishCandles': analysis_results['bearish_candles'],
-                    'NeutralCandles': analysis_results['neutral_candles'],
-                    'TotalVolume': analysis_results['total_volume']
-                })
-        
-        if not results:
-            logger.info(f"No daily session analysis could be performed for {symbol}, session {session_definition.name}.")
-            return pd.DataFrame(columns=output_columns)
+        if NUMBA_AVAILABLE:
+            # Ядро читает отрезки [lo, hi) прямо из массивов родительского DataFrame, без промежуточных копий
+            (opens, closes, highs, lows, trend_codes,
+             bullish, bearish, neutral, volumes) = session_day_stats(
+                lo, hi,
+                _price_array(market_data['Open']),
+                _price_array(market_data['High']),
+                _price_array(market_data['Low']),
+                _price_array(market_data['Close']),
+                market_data['Volume'].to_numpy()
+            )
+        else:
+            # Без numba: колонки сессии берутся из SessionView как компактные массивы, дни в них - непрерывные отрезки,
+            # max/min/sum считаются через reduceat (fmax/fmin и nan_to_num пропускают NaN, как pandas)
+            lengths = hi - lo
+            segment_starts = np.cumsum(lengths) - lengths
+            open_arr = session_view['Open']
+            close_arr = session_view['Close']
+            opens = open_arr[segment_starts].astype(np.float64)
+            closes = close_arr[segment_starts + lengths - 1].astype(np.float64)
+            highs = np.fmax.reduceat(session_view['High'], segment_starts).astype(np.float64)
+            lows = np.fmin.reduceat(session_view['Low'], segment_starts).astype(np.float64)
+            day_ids = np.repeat(np.arange(len(session_days)), lengths)
+            bullish, bearish, neutral = count_candles_per_day(open_arr, close_arr, day_ids, len(session_days))
+            volumes = np.add.reduceat(np.nan_to_num(session_view['Volume']), segment_starts)
+            trend_codes = np.full(len(session_days), TREND_FLAT, dtype=np.int8)
+            trend_codes[closes > opens] = TREND_BULLISH
+            trend_codes[closes < opens] = TREND_BEARISH
+
+        # Trend и SessionName - категориальные колонки: 1 байт кода на строку вместо Python-строк
+        return pd.DataFrame({
+            'Date': session_days,
+            'SessionName': pd.Categorical.from_codes(
+                np.zeros(len(session_days), dtype=np.int8), categories=[session_definition.name]
+            ),
+            'Trend': pd.Categorical.from_codes(trend_codes, categories=TREND_LABELS),
+            'SessionOpen': opens,
+            'SessionClose': closes,
+            'SessionHigh': highs,
+            'SessionLow': lows,
+            'BullishCandles': bullish,
+            'BearishCandles': bearish,
+            'NeutralCandles': neutral,
+            'TotalVolume': volumes,
+        })
+
+    def get_session_data_multi(
+        self,
+        symbol: str,
+        session_defs: List[SessionDefinition],
+        start_date_dt: datetime,
+        end_date_dt: datetime,
+        data_interval: str = "1h"
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Извлекает данные сразу для нескольких сессий одного символа. Рыночные данные
+        загружаются и приводятся к UTC один раз, дальше для каждой сессии выполняется только поиск границ.
 
-        return pd.DataFrame(results, columns=output_columns)
+        Returns:
+            Словарь {session_name: DataFrame} в формате get_session_data.
+        """
+        market_data, idx_ns = self._get_market_data(symbol, start_date_dt, end_date_dt, data_interval)
+        if market_data.empty:
+            logger.warning(f"No market data found for {symbol} to analyze sessions {[session_def.name for session_def in session_defs]}.")
+        return {
+            session_def.name: self._session_data_from_view(
+                symbol, session_def, self._session_view(market_data, idx_ns, session_def, start_date_dt, end_date_dt)
+            )
+            for session_def in session_defs
+        }
+
+    def get_daily_session_analysis_multi(
+        self,
+        symbol: str,
+        session_defs: List[SessionDefinition],
+        start_date_dt: datetime,
+        end_date_dt: datetime,
+        data_interval: str = "1h"
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        get_daily_session_analysis для нескольких сессий одного символа по однажды загруженным данным.
+
+        Returns:
+            Словарь {session_name: DataFrame} в формате get_daily_session_analysis.
+        """
+        market_data, idx_ns = self._get_market_data(symbol, start_date_dt, end_date_dt, data_interval)
+        if market_data.empty:
+            logger.warning(f"No market data found for {symbol} to analyze sessions {[session_def.name for session_def in session_defs]}.")
+        return {
+            session_def.name: self._daily_session_analysis_from_data(
+                symbol, session_def, market_data, idx_ns, start_date_dt, end_date_dt
+            )
+            for session_def in session_defs
+        }
+
+    def batch_daily_session_analysis(
+        self,
+        jobs: List[Tuple[str, SessionDefinition]],
+        start_date_dt: datetime,
+        end_date_dt: datetime,
+        data_interval: str = "1h",
+        workers: Optional[int] = None
+    ) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """
+        Выполняет get_daily_session_analysis для набора пар (символ, сессия) параллельно в нескольких процессах.
+
+        Каждый воркер создает собственный SessionAnalyzer с копией data_manager, поэтому кэш в памяти
+        между процессами не разделяется; общим остается файловый кэш DataManager (parquet), так что
+        повторные запуски читают данные с диска, а не из сети.
+
+        Args:
+            jobs: Список пар (symbol, session_definition).
+            start_date_dt: Начальная дата периода.
+            end_date_dt: Конечная дата периода.
+            data_interval: Интервал свечей.
+            workers: Количество процессов (по умолчанию os.cpu_count()).
+
+        Returns:
+            Словарь {(symbol, session_name): DataFrame}, где DataFrame имеет формат get_daily_session_analysis.
+        """
+        if not jobs:
+            return {}
+
+        worker = partial(_daily_session_analysis_worker, self.data_manager, start_date_dt, end_date_dt, data_interval)
+        logger.info(f"Running daily session analysis for {len(jobs)} jobs in a process pool (workers={workers or 'auto'}).")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(worker, jobs))
+
+        return {
+            (symbol, session_definition.name): result
+            for (symbol, session_definition), result in zip(jobs, results)
+        }
+
+    def get_daily_session_analysis_batch(
+        self,
+        symbols: List[str],
+        session_definition: SessionDefinition,
+        start_date_dt: datetime,
+        end_date_dt: datetime,
+        data_interval: str = "1h",
+        workers: Optional[int] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        get_daily_session_analysis одной сессии для списка символов в пуле процессов
+        (обертка над batch_daily_session_analysis).
+
+        Returns:
+            Словарь {symbol: DataFrame} в формате get_daily_session_analysis.
+        """
+        results = self.batch_daily_session_analysis(
+            [(symbol, session_definition) for symbol in symbols],
+            start_date_dt, end_date_dt, data_interval, workers
+        )
+        return {symbol: result for (symbol, _), result in results.items()}
+
+
+def _daily_session_analysis_worker(
+    data_manager: DataManager,
+    start_date_dt: datetime,
+    end_date_dt: datetime,
+    data_interval: str,
+    job: Tuple[str, SessionDefinition]
+) -> pd.DataFrame:
+    """
+    Точка входа процесса-воркера для SessionAnalyzer.batch_daily_session_analysis.
+    Функция модульного уровня, чтобы ее можно было передать в ProcessPoolExecutor (pickle).
+    """
+    symbol, session_definition = job
+    return SessionAnalyzer(data_manager).get_daily_session_analysis(
+        symbol, session_definition, start_date_dt, end_date_dt, data_interval
+    )
 
 # Пример использования (для тестирования):
 if __name__ == '__main__':
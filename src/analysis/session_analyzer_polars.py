@@ -0,0 +1,113 @@
+"""
+Вариант дневного анализа сессий на Polars: фильтрация свечей по локальному времени биржи и
+агрегация по дням выполняются одним ленивым запросом на колоночных Arrow-данных.
+
+polars - опциональная зависимость. Если она не установлена, POLARS_AVAILABLE = False,
+а создание PolarsSessionAnalyzer вызывает ImportError.
+"""
+import numpy as np
+import pandas as pd
+from datetime import datetime
+import logging
+
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    pl = None
+    POLARS_AVAILABLE = False
+
+from src.core.data_manager import DataManager
+from src.core.trading_sessions import SessionDefinition
+from src.analysis._session_kernels import TREND_BULLISH, TREND_BEARISH, TREND_FLAT, TREND_LABELS
+from src.analysis.session_analyzer import SessionAnalyzer, DEFAULT_MARKET_DATA_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class PolarsSessionAnalyzer(SessionAnalyzer):
+    """
+    SessionAnalyzer, у которого get_daily_session_analysis (и get_daily_session_analysis_multi) выполняется на Polars.
+    Загрузка и кэширование рыночных данных общие с SessionAnalyzer, формат результата тот же.
+
+    Свеча относится к сессии, если ее локальное время на бирже попадает в [local_start_time, local_end_time];
+    у сессий через полночь утренние свечи относятся ко дню открытия. В отличие от SessionAnalyzer,
+    дни, в которые граница сессии попадает на переход DST, не исключаются.
+    """
+
+    def __init__(self, data_manager: DataManager, market_data_cache_size: int = DEFAULT_MARKET_DATA_CACHE_SIZE):
+        if not POLARS_AVAILABLE:
+            raise ImportError("Для PolarsSessionAnalyzer нужен пакет polars (pip install polars).")
+        super().__init__(data_manager, market_data_cache_size)
+
+    def _daily_session_analysis_from_data(
+        self,
+        symbol: str,
+        session_definition: SessionDefinition,
+        market_data: pd.DataFrame,
+        idx_ns: np.ndarray,
+        start_date_dt: datetime,
+        end_date_dt: datetime
+    ) -> pd.DataFrame:
+        """
+        Дневной анализ сессии по уже загруженным рыночным данным одним ленивым запросом Polars.
+
+        Returns:
+            DataFrame в формате SessionAnalyzer.get_daily_session_analysis.
+        """
+        if market_data.empty:
+            return pd.DataFrame()
+
+        start_time = session_definition.local_start_time
+        end_time = session_definition.local_end_time
+        local_ts = pl.col('ts').dt.convert_time_zone(str(session_definition.exchange_timezone))
+        local_time = local_ts.dt.time()
+        local_date = local_ts.dt.date()
+        if end_time < start_time:
+            # Сессия пересекает полночь: свечи после полуночи относятся к предыдущему дню
+            in_session = (local_time >= start_time) | (local_time <= end_time)
+            session_day = pl.when(local_time >= start_time).then(local_date).otherwise(local_date - pl.duration(days=1))
+        else:
+            in_session = local_time.is_between(start_time, end_time, closed='both')
+            session_day = local_date
+
+        # nan_to_null: пропуски становятся null, и max/min/sum/сравнения их пропускают, как в SessionAnalyzer
+        daily = (
+            pl.from_pandas(market_data.rename_axis('ts').reset_index(), nan_to_null=True)
+            .lazy()
+            .filter(in_session)
+            .with_columns(session_day.alias('Date'))
+            .filter(pl.col('Date').is_between(start_date_dt.date(), end_date_dt.date(), closed='both'))
+            .group_by('Date', maintain_order=True)
+            .agg(
+                pl.col('Open').first().alias('SessionOpen'),
+                pl.col('Close').last().alias('SessionClose'),
+                pl.col('High').max().alias('SessionHigh'),
+                pl.col('Low').min().alias('SessionLow'),
+                (pl.col('Close') > pl.col('Open')).sum().cast(pl.Int64).alias('BullishCandles'),
+                (pl.col('Close') < pl.col('Open')).sum().cast(pl.Int64).alias('BearishCandles'),
+                (pl.col('Close') == pl.col('Open')).sum().cast(pl.Int64).alias('NeutralCandles'),
+                pl.col('Volume').sum().alias('TotalVolume'),
+            )
+            .with_columns(
+                pl.when(pl.col('SessionClose') > pl.col('SessionOpen')).then(TREND_BULLISH)
+                .when(pl.col('SessionClose') < pl.col('SessionOpen')).then(TREND_BEARISH)
+                .otherwise(TREND_FLAT)
+                .cast(pl.Int8)
+                .alias('TrendCode'),
+            )
+            .collect()
+        )
+
+        if daily.height == 0:
+            logger.warning(f"No session data to analyze daily characteristics for {symbol}, session {session_definition.name}.")
+            return pd.DataFrame()
+
+        result = daily.drop('TrendCode').to_pandas()
+        # Тот же тип Date, что у SessionAnalyzer: дни из pd.date_range по датам имеют разрешение секунд
+        result['Date'] = pd.to_datetime(result['Date']).dt.as_unit('s')
+        result.insert(1, 'SessionName', pd.Categorical.from_codes(
+            np.zeros(daily.height, dtype=np.int8), categories=[session_definition.name]
+        ))
+        result.insert(2, 'Trend', pd.Categorical.from_codes(daily['TrendCode'].to_numpy(), categories=TREND_LABELS))
+        return result
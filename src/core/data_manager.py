@@ -1,15 +1,62 @@
 import pandas as pd
-from datetime import datetime, date
+import pyarrow.parquet as pq
+from datetime import datetime, date, time
 import os
-import hashlib
+import json
 import logging
-from typing import Optional
+from collections import OrderedDict
+from typing import Optional, Tuple, List, Sequence
 
 from src.core.data_source import DataSource
+from src.core.storage import DEFAULT_CACHE_TTL_DAYS, PARQUET_WRITE_OPTIONS, apply_price_dtype
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_CACHE_DIR = "data/cache"
+DEFAULT_MEMORY_CACHE_SIZE = 32
+
+
+def _merge_ranges(ranges: List[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    """Объединяет пересекающиеся и смежные диапазоны дат [начало, конец) в отсортированный список."""
+    merged: List[Tuple[date, date]] = []
+    for range_start, range_end in sorted(ranges):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+def _uncovered_ranges(covered: List[Tuple[date, date]], start_day: date, end_day: date) -> List[Tuple[date, date]]:
+    """Возвращает части диапазона [start_day, end_day), не покрытые отсортированными диапазонами covered."""
+    missing = []
+    cursor = start_day
+    for range_start, range_end in covered:
+        if range_end <= cursor:
+            continue
+        if range_start >= end_day:
+            break
+        if range_start > cursor:
+            missing.append((cursor, range_start))
+        cursor = max(cursor, range_end)
+    if cursor < end_day:
+        missing.append((cursor, end_day))
+    return missing
+
+
+def _slice_days(data: pd.DataFrame, start_day: date, end_day: date) -> pd.DataFrame:
+    """
+    Вырезает из отсортированного по времени data строки за дни [start_day, end_day).
+    Границы дней берутся в часовом поясе индекса, как их трактует источник (yfinance).
+    """
+    if data.empty:
+        return data
+    bounds = pd.DatetimeIndex([pd.Timestamp(start_day), pd.Timestamp(end_day)])
+    if data.index.tz is not None:
+        bounds = bounds.tz_localize(data.index.tz, ambiguous=[True, True], nonexistent='shift_forward')
+    lo, hi = data.index.searchsorted(bounds)
+    return data.iloc[lo:hi]
+
 
 class DataManager:
     """
@@ -18,108 +65,300 @@ class DataManager:
     и сохраняет их в локальном кэше (Parquet файлы) для ускорения доступа.
     """
 
-    def __init__(self, data_source: DataSource, cache_dir: str = DEFAULT_CACHE_DIR):
+    def __init__(
+        self,
+        data_source: DataSource,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        cache_ttl_days: Optional[int] = DEFAULT_CACHE_TTL_DAYS,
+        memory_cache_size: int = DEFAULT_MEMORY_CACHE_SIZE,
+        price_dtype: Optional[str] = None
+    ):
         """
         Инициализирует DataManager.
 
         Args:
             data_source: Экземпляр класса, реализующего DataSource (например, YahooFinanceConnector).
             cache_dir: Директория для хранения кэшированных файлов.
+            cache_ttl_days: Срок жизни файла кэша в днях; более старые файлы загружаются заново.
+                            None - кэш не устаревает.
+            memory_cache_size: Сколько последних прочитанных DataFrame держать в памяти процесса,
+                               чтобы повторные запросы не читали parquet с диска. 0 - отключить.
+            price_dtype: Тип ценовых колонок Open/High/Low/Close в результатах, например 'float32'.
+                         float32 вдвое уменьшает объем данных, но хранит только ~7 значащих цифр
+                         (для цен вида 12345.67 это уже предел точности). None - оставить как есть (float64).
+                         Файлы кэша всегда хранят исходные типы источника, приведение выполняется при возврате,
+                         поэтому DataManager с разными price_dtype могут работать с одной cache_dir.
         """
         self.data_source = data_source
         self.cache_dir = cache_dir
+        self.cache_ttl_days = cache_ttl_days
+        self.memory_cache_size = memory_cache_size
+        self.price_dtype = price_dtype
+        # LRU: (путь к файлу кэша, набор колонок) -> (mtime файла, DataFrame).
+        # По mtime понимаем, что файл перезаписан.
+        self._mem_cache: "OrderedDict[Tuple[str, Optional[Tuple[str, ...]]], Tuple[float, pd.DataFrame]]" = OrderedDict()
         os.makedirs(self.cache_dir, exist_ok=True) # Создаем директорию кэша, если ее нет
 
-    def _generate_cache_filename(self, symbol: str, start_date: datetime, end_date: datetime, interval: str) -> str:
+    def __getstate__(self) -> dict:
+        # DataManager передается в процессы-воркеры (SessionAnalyzer.batch_daily_session_analysis) с каждой задачей;
+        # кэш в памяти воркеру не нужен и увеличил бы каждую задачу на размер всех закэшированных DataFrame
+        state = self.__dict__.copy()
+        state['_mem_cache'] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._mem_cache = OrderedDict()
+
+    def _generate_cache_filename(self, symbol: str, interval: str) -> str:
         """
-        Генерирует имя файла для кэша на основе параметров запроса.
-        Использует хэш для уникальности и сокращения длины имени.
+        Генерирует имя файла кэша для пары (символ, интервал). Один файл хранит все загруженные
+        диапазоны дат, а какие именно диапазоны в нем есть, записано в манифесте рядом с ним.
         """
-        # Нормализуем даты до строк, чтобы хэш был консистентным
-        start_str = start_date.strftime('%Y-%m-%d')
-        end_str = end_date.strftime('%Y-%m-%d')
-        
-        # Создаем уникальную строку для хэширования
-        unique_string = f"{symbol}_{start_str}_{end_str}_{interval}"
-        # Используем SHA256 для хэширования, берем первые 16 символов для компактности
-        hash_suffix = hashlib.sha256(unique_string.encode()).hexdigest()[:16]
-        
-        filename = f"{symbol}_{interval}_{hash_suffix}.parquet"
+        filename = f"{symbol}_{interval}.parquet"
         return os.path.join(self.cache_dir, filename)
 
+    @staticmethod
+    def _manifest_filepath(cache_filepath: str) -> str:
+        """Путь к манифесту (JSON со списком покрытых диапазонов дат) для файла кэша."""
+        return os.path.splitext(cache_filepath)[0] + ".manifest.json"
+
+    def _load_manifest(self, cache_filepath: str) -> Tuple[List[Tuple[date, date]], date]:
+        """
+        Читает покрытые кэшем диапазоны дат [начало, конец) и дату создания кэша.
+        Если файла кэша или манифеста нет, манифест поврежден или кэш старше cache_ttl_days,
+        возвращает пустой список диапазонов и сегодняшнюю дату (кэш строится заново).
+        """
+        manifest_filepath = self._manifest_filepath(cache_filepath)
+        if not (os.path.exists(cache_filepath) and os.path.exists(manifest_filepath)):
+            return [], date.today()
+        try:
+            with open(manifest_filepath, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            created = date.fromisoformat(manifest["created"])
+            ranges = [(date.fromisoformat(start), date.fromisoformat(end)) for start, end in manifest["ranges"]]
+        except Exception as e:
+            logger.warning(f"Error reading cache manifest {manifest_filepath}: {e}. Rebuilding cache.")
+            return [], date.today()
+
+        # Кэш старше cache_ttl_days считаем устаревшим целиком
+        if self.cache_ttl_days is not None and (date.today() - created).days > self.cache_ttl_days:
+            logger.info(f"Cache file {cache_filepath} is older than {self.cache_ttl_days} days. Refreshing.")
+            return [], date.today()
+        return _merge_ranges(ranges), created
+
+    def _save_manifest(self, cache_filepath: str, ranges: List[Tuple[date, date]], created: date) -> None:
+        """Атомарно записывает манифест кэша."""
+        manifest = {
+            "created": created.isoformat(),
+            "ranges": [[start.isoformat(), end.isoformat()] for start, end in ranges],
+        }
+        manifest_filepath = self._manifest_filepath(cache_filepath)
+        tmp_filepath = f"{manifest_filepath}.{os.getpid()}.tmp"
+        with open(tmp_filepath, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_filepath, manifest_filepath)
+
+    def _get_from_memory(self, memory_key: tuple, file_mtime: float) -> Optional[pd.DataFrame]:
+        """
+        Возвращает DataFrame из кэша в памяти, если он прочитан из текущей версии файла.
+        Отдается поверхностная копия, чтобы замена индекса или колонок у вызывающего не меняла кэш.
+        """
+        entry = self._mem_cache.get(memory_key)
+        if entry is None or entry[0] != file_mtime:
+            return None
+        self._mem_cache.move_to_end(memory_key)
+        return entry[1].copy(deep=False)
+
+    def _put_to_memory(self, memory_key: tuple, file_mtime: float, data: pd.DataFrame) -> None:
+        """Кладет DataFrame в кэш в памяти, вытесняя самые давно использованные записи."""
+        if self.memory_cache_size <= 0:
+            return
+        self._mem_cache[memory_key] = (file_mtime, data.copy(deep=False))
+        self._mem_cache.move_to_end(memory_key)
+        while len(self._mem_cache) > self.memory_cache_size:
+            self._mem_cache.popitem(last=False)
+
+    def _drop_from_memory(self, cache_filepath: str) -> None:
+        """Удаляет из кэша в памяти все наборы колонок, прочитанные из файла cache_filepath."""
+        for memory_key in [key for key in self._mem_cache if key[0] == cache_filepath]:
+            del self._mem_cache[memory_key]
+
+    @staticmethod
+    def _read_parquet(cache_filepath: str, columns: Optional[List[str]]) -> pd.DataFrame:
+        """
+        Читает файл кэша через pyarrow с отображением файла в память (memory_map) и,
+        если задан columns, только с нужными колонками. Отсутствующие в файле колонки пропускаются.
+        """
+        parquet_file = pq.ParquetFile(cache_filepath, memory_map=True)
+        if columns is not None:
+            available = set(parquet_file.schema_arrow.names)
+            columns = [col for col in columns if col in available]
+        return parquet_file.read(columns=columns, use_pandas_metadata=True).to_pandas()
+
+    @staticmethod
+    def _select_columns(data: pd.DataFrame, columns: Optional[List[str]]) -> pd.DataFrame:
+        """Оставляет в data только колонки из columns (имеющиеся в data); None - все колонки."""
+        if columns is None:
+            return data
+        return data[[col for col in columns if col in data.columns]]
+
     def get_data(
         self,
         symbol: str,
         start_date: datetime,
         end_date: datetime,
         interval: str = "1d",
-        force_refresh: bool = False # Флаг для принудительной загрузки без использования кэша
+        force_refresh: bool = False, # Флаг для принудительной загрузки без использования кэша
+        columns: Optional[Sequence[str]] = None
     ) -> pd.DataFrame:
         """
         Получает исторические данные. Сначала пытается загрузить из кэша.
-        Если в кэше нет или force_refresh=True, загружает через DataSource и сохраняет в кэш.
+        Кэш ведется на пару (символ, интервал): из источника загружаются только те части
+        диапазона [start_date, end_date), которых еще нет в кэше, и дописываются в него.
+        При force_refresh=True весь запрошенный диапазон загружается заново.
 
         Args:
             symbol: Тикер инструмента.
             start_date: Начальная дата.
-            end_date: Конечная дата.
+            end_date: Конечная дата (не включается, как в yfinance).
             interval: Интервал свечей.
             force_refresh: Если True, данные будут загружены из источника, даже если есть в кэше.
+            columns: Нужные колонки (например, ['Open', 'Close']). Из кэша читаются только они;
+                     None - все колонки.
 
         Returns:
             pandas.DataFrame с данными или пустой DataFrame в случае ошибки.
         """
-        cache_filepath = self._generate_cache_filename(symbol, start_date, end_date, interval)
+        cache_filepath = self._generate_cache_filename(symbol, interval)
+        columns = list(columns) if columns is not None else None
+        start_day, end_day = start_date.date(), end_date.date()
 
-        if not force_refresh and os.path.exists(cache_filepath):
+        covered, created = self._load_manifest(cache_filepath)
+        if force_refresh:
+            self._drop_from_memory(cache_filepath)
+            missing = [(start_day, end_day)] if start_day < end_day else []
+        else:
+            missing = _uncovered_ranges(covered, start_day, end_day)
+
+        if not missing and covered:
             try:
-                # Проверяем "свежесть" кэша для дневных данных
-                # Если данные дневные и файл кэша создан не сегодня, и конечная дата >= сегодня, то стоит обновить
-                # Это очень упрощенная проверка, можно усложнить (например, проверять время последней торговой сессии)
-                if interval == "1d":
-                    file_mod_date = date.fromtimestamp(os.path.getmtime(cache_filepath))
-                    # Если конечная дата включает сегодняшний или будущий день, и файл не сегодняшний, 
-                    # то данные могут быть неполными за сегодня.
-                    if end_date.date() >= date.today() and file_mod_date < date.today():
-                        logger.info(f"Cache file {cache_filepath} for interval '1d' might be stale for today. Refreshing.")
-                        return self._fetch_and_cache(symbol, start_date, end_date, interval, cache_filepath)
-                
+                data = self._read_cached(cache_filepath, columns)
                 logger.info(f"Loading data for {symbol} from cache: {cache_filepath}")
-                return pd.read_parquet(cache_filepath)
+                return apply_price_dtype(_slice_days(data, start_day, end_day), self.price_dtype)
             except Exception as e:
                 logger.warning(f"Error reading from cache file {cache_filepath}: {e}. Fetching from source.")
-                # Если ошибка чтения кэша, пробуем загрузить заново
-                return self._fetch_and_cache(symbol, start_date, end_date, interval, cache_filepath)
-        
-        # Если кэша нет или force_refresh=True
-        return self._fetch_and_cache(symbol, start_date, end_date, interval, cache_filepath)
+                # Если ошибка чтения кэша, строим его заново по запрошенному диапазону
+                covered = []
+                missing = [(start_day, end_day)]
+
+        return self._fetch_and_cache(
+            symbol, interval, cache_filepath, covered, created, missing, start_day, end_day, columns
+        )
+
+    def _read_cached(self, cache_filepath: str, columns: Optional[List[str]]) -> pd.DataFrame:
+        """
+        Читает файл кэша целиком (все диапазоны), используя кэш в памяти, если файл не менялся.
+        Типы колонок остаются как в файле: price_dtype применяется к возвращаемому срезу.
+        """
+        file_mtime = os.path.getmtime(cache_filepath)
+        memory_key = (cache_filepath, tuple(columns) if columns is not None else None)
+        data = self._get_from_memory(memory_key, file_mtime)
+        if data is not None:
+            logger.debug("Using memory cache for %s", cache_filepath)
+            return data
+        data = self._read_parquet(cache_filepath, columns)
+        self._put_to_memory(memory_key, file_mtime, data)
+        return data
 
     def _fetch_and_cache(
         self,
         symbol: str,
-        start_date: datetime,
-        end_date: datetime,
         interval: str,
-        cache_filepath: str
+        cache_filepath: str,
+        covered: List[Tuple[date, date]],
+        created: date,
+        missing: List[Tuple[date, date]],
+        start_day: date,
+        end_day: date,
+        columns: Optional[List[str]]
     ) -> pd.DataFrame:
         """
-        Вспомогательный метод: загружает данные из DataSource и сохраняет их в кэш.
+        Вспомогательный метод: загружает недостающие диапазоны из DataSource, объединяет их
+        с уже закэшированными данными, сохраняет результат в кэш и возвращает запрошенный диапазон.
+
+        Диапазон, за который источник вернул пустой DataFrame (выходные, праздники), тоже записывается
+        в манифест как покрытый, чтобы не запрашивать его снова. Диапазон, загрузка которого завершилась
+        исключением (DataSourceError), остается непокрытым и будет запрошен при следующем вызове.
         """
-        logger.info(f"Fetching data for {symbol} from {self.data_source.__class__.__name__}.")
-        data = self.data_source.fetch_data(symbol, start_date, end_date, interval)
+        cached = None
+        if covered:
+            try:
+                cached = self._read_cached(cache_filepath, None)
+            except Exception as e:
+                logger.warning(f"Error reading from cache file {cache_filepath}: {e}. Rebuilding cache.")
+                covered = []
+                created = date.today()
+                missing = [(start_day, end_day)]
 
-        if not data.empty:
+        fetched = []
+        fetched_ranges = []
+        for range_start, range_end in missing:
+            logger.info(f"Fetching data for {symbol} from {range_start} to {range_end} from {self.data_source.__class__.__name__}.")
             try:
-                data.to_parquet(cache_filepath)
-                logger.info(f"Data for {symbol} cached to {cache_filepath}")
+                data = self.data_source.fetch_data(
+                    symbol, datetime.combine(range_start, time()), datetime.combine(range_end, time()), interval
+                )
             except Exception as e:
-                logger.error(f"Error saving data to cache file {cache_filepath}: {e}")
-        else:
-            logger.warning(f"No data fetched for {symbol}, not caching.")
-        
-        return data
+                logger.error(f"Error fetching data for {symbol} from {range_start} to {range_end}: {e}. Range stays uncovered.")
+                continue
+            fetched_ranges.append((range_start, range_end))
+            if data.empty:
+                logger.warning(f"No data fetched for {symbol} from {range_start} to {range_end}.")
+                continue
+            fetched.append(data)
+
+        # Данные за сегодняшний и будущие дни могут быть неполными - такие дни не считаем покрытыми
+        today = date.today()
+        new_ranges = [(range_start, min(range_end, today)) for range_start, range_end in fetched_ranges]
+        ranges = _merge_ranges(covered + [r for r in new_ranges if r[0] < r[1]])
+
+        if not fetched:
+            if cached is None:
+                # Файла кэша нет, и записывать нечего: манифест без данных не сохраняется
+                return pd.DataFrame()
+            if ranges != covered:
+                # Новых свечей нет, но пустые диапазоны теперь покрыты - обновляем только манифест
+                try:
+                    self._save_manifest(cache_filepath, ranges, created)
+                except Exception as e:
+                    logger.error(f"Error saving cache manifest for {cache_filepath}: {e}")
+            return apply_price_dtype(self._select_columns(_slice_days(cached, start_day, end_day), columns), self.price_dtype)
 
-    def get_info(self, symbol: str, force_refresh: bool = False) -> Optional[dict]:
+        # Новые данные перекрывают закэшированные с теми же метками времени
+        data = pd.concat(([cached] if cached is not None else []) + fetched)
+        data = data[~data.index.duplicated(keep='last')]
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index()
+
+        try:
+            tmp_filepath = f"{cache_filepath}.{os.getpid()}.tmp"
+            data.to_parquet(tmp_filepath, **PARQUET_WRITE_OPTIONS)
+            os.replace(tmp_filepath, cache_filepath)
+            self._save_manifest(cache_filepath, ranges, created)
+            logger.info(f"Data for {symbol} cached to {cache_filepath}")
+            self._put_to_memory((cache_filepath, None), os.path.getmtime(cache_filepath), data)
+        except Exception as e:
+            logger.error(f"Error saving data to cache file {cache_filepath}: {e}")
+
+        return apply_price_dtype(self._select_columns(_slice_days(data, start_day, end_day), columns), self.price_dtype)
+
+    def get_info(
+        self,
+        symbol: str,
+        force_refresh: bool = False,
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[dict]:
         """
         Получает информацию об инструменте. Кэширование информации об инструменте (например, в JSON файл) 
         также может быть реализовано по аналогии с get_data, если это необходимо.
@@ -130,6 +369,8 @@ class DataManager:
             force_refresh: Если True, информация будет запрошена из источника заново 
                            (полезно, если информация могла обновиться).
                            Текущая реализация не использует кэш для get_info.
+            fields: Нужные поля; передаются в data_source.get_info, чтобы источник мог не загружать
+                    полную информацию (YahooFinanceConnector берет их из fast_info). None - вся информация.
         Returns:
             Словарь с информацией или None.
         """
@@ -138,7 +379,10 @@ class DataManager:
         #       Имя файла можно генерировать: f"{symbol}_info.json"
         logger.info(f"Fetching info for {symbol} directly from {self.data_source.__class__.__name__} (caching not implemented for info yet).")
         try:
-            info = self.data_source.get_info(symbol)
+            if fields is not None:
+                info = self.data_source.get_info(symbol, fields=fields)
+            else:
+                info = self.data_source.get_info(symbol)
             return info if info else None
         except Exception as e:
             logger.error(f"Error fetching info for {symbol} via data_source: {e}")
@@ -196,10 +440,10 @@ if __name__ == '__main__':
     else:
         print(f"Failed to fetch data for {symbol_test} (forced refresh).")
 
-    # 4. Пример с другой датой (новый файл кэша)
+    # 4. Пример с другой датой (догружается в тот же файл кэша)
     start_dt_new = datetime(2023, 7, 1)
     end_dt_new = datetime(2023, 12, 31)
-    print(f"\n4. Fetch for {symbol_test} with new date range (should be from source, new cache file):")
+    print(f"\n4. Fetch for {symbol_test} with new date range (should be from source, appended to the same cache file):")
     df_msft4 = data_manager.get_data(symbol_test, start_dt_new, end_dt_new, interval_test)
     if not df_msft4.empty:
         print(f"Successfully fetched {len(df_msft4)} rows for {symbol_test} (new date range).")
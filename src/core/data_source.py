@@ -1,6 +1,13 @@
 from abc import ABC, abstractmethod
 import pandas as pd
 from datetime import datetime
+from typing import Optional, Iterable
+
+class DataSourceError(Exception):
+    """
+    Ошибка загрузки данных из источника (сеть, ответ API и т.п.). Отличает неудачную загрузку
+    от диапазона, за который данных просто нет: такой диапазон DataManager считает покрытым кэшем.
+    """
 
 class DataSource(ABC):
     """
@@ -28,7 +35,8 @@ class DataSource(ABC):
 
         Returns:
             pandas.DataFrame с колонками [Open, High, Low, Close, Volume, (Datetime index)].
-            В случае ошибки или отсутствия данных должен возвращать пустой DataFrame.
+            Если за период нет данных (выходные, праздники, период до листинга), должен возвращать пустой DataFrame.
+            Если загрузить данные не удалось, должен возбуждать DataSourceError.
         """
         pass
 
@@ -41,9 +49,15 @@ class DataSource(ABC):
         pass
 
     @abstractmethod
-    def get_info(self, symbol: str) -> dict:
+    def get_info(self, symbol: str, fields: Optional[Iterable[str]] = None) -> dict:
         """
         Возвращает информацию об инструменте (например, название компании, сектор, индустрия).
         Этот метод может быть не реализован для всех источников.
+
+        Args:
+            symbol: Тикер инструмента.
+            fields: Нужные поля (например, ['currency', 'marketCap']). Источник может использовать их,
+                    чтобы не загружать полную информацию, и должен вернуть словарь только с этими полями.
+                    None - вся доступная информация.
         """
         pass 
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Общие параметры хранения рыночных данных: используются и DataManager, и коннекторами источников,
+поэтому вынесены в отдельный модуль без зависимостей от них.
+"""
+
+from typing import Optional
+
+import pandas as pd
+
+# Срок жизни файлов кэша в днях по умолчанию: скорректированные цены (auto_adjust) пересчитываются
+# задним числом после дивидендов и сплитов, поэтому старый кэш расходится с новыми загрузками
+DEFAULT_CACHE_TTL_DAYS = 90
+
+# Параметры записи parquet-кэша: ZSTD сжимает лучше snappy при сопоставимой скорости чтения,
+# а небольшие группы строк со статистикой позволяют читателю пропускать ненужные диапазоны дат
+PARQUET_WRITE_OPTIONS = {
+    'engine': 'pyarrow',
+    'compression': 'zstd',
+    'compression_level': 3,
+    'row_group_size': 50_000,
+    'use_dictionary': True,
+    'write_statistics': True,
+}
+# Ценовые колонки, к которым применяется price_dtype (Volume остается целочисленным)
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close']
+
+
+def apply_price_dtype(data: pd.DataFrame, price_dtype: Optional[str]) -> pd.DataFrame:
+    """Приводит ценовые колонки к price_dtype; колонки, уже имеющие этот тип, не копируются. None - без изменений."""
+    if price_dtype is None:
+        return data
+    casts = {col: price_dtype for col in PRICE_COLUMNS if col in data.columns and data[col].dtype != price_dtype}
+    return data.astype(casts) if casts else data
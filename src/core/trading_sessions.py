@@ -1,8 +1,26 @@
 from dataclasses import dataclass
 from datetime import time, date, datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional, Mapping
+import json
+import os
+import numpy as np
+import pandas as pd
 import pytz
 
-@dataclass
+# Смещение на одни сутки; создается один раз, а не при каждом расчете границ сессии
+ONE_DAY = timedelta(days=1)
+
+@lru_cache(maxsize=64)
+def get_timezone(name: str) -> pytz.BaseTzInfo:
+    """
+    Возвращает объект pytz для имени часового пояса. Результат кэшируется, поэтому один и тот же
+    пояс разбирается один раз, а все сессии с этим поясом разделяют один объект tzinfo.
+    """
+    return pytz.timezone(name)
+
+@dataclass(frozen=True)
 class SessionDefinition:
     """
     Определяет торговую сессию через ее локальное время на бирже и часовой пояс биржи.
@@ -15,9 +33,11 @@ class SessionDefinition:
     description: str = ""
 
     def __post_init__(self):
-        # Проверка, что часовой пояс валидный
+        # Проверка, что часовой пояс валидный, и сохранение объекта pytz для повторного использования.
+        # str() приводит и ZoneInfo к имени зоны: работаем только с pytz, он быстрее в pandas.
+        # Датакласс неизменяемый, поэтому _tz устанавливается через object.__setattr__.
         try:
-            pytz.timezone(self.exchange_timezone)
+            object.__setattr__(self, '_tz', get_timezone(str(self.exchange_timezone)))
         except pytz.exceptions.UnknownTimeZoneError:
             raise ValueError(f"Неизвестный часовой пояс: {self.exchange_timezone}")
 
@@ -37,7 +57,16 @@ def get_utc_session_boundaries_for_date(
         Кортеж (start_utc_dt, end_utc_dt) с datetime объектами в UTC.
         Возбуждает исключение, если не удается определить время (например, из-за DST перехода в момент открытия/закрытия).
     """
-    tz = pytz.timezone(session_def.exchange_timezone)
+    tz = session_def._tz
+
+    # Быстрый путь для сессий в UTC: локальное время уже является временем UTC,
+    # localize и astimezone не нужны
+    if tz is pytz.utc:
+        end_date = target_date + ONE_DAY if session_def.local_end_time < session_def.local_start_time else target_date
+        return (
+            datetime.combine(target_date, session_def.local_start_time, tzinfo=pytz.utc),
+            datetime.combine(end_date, session_def.local_end_time, tzinfo=pytz.utc),
+        )
 
     # Создаем datetime объекты в локальном времени биржи
     # is_dst=None используется для обработки неоднозначного времени при переходе DST
@@ -47,7 +76,7 @@ def get_utc_session_boundaries_for_date(
 
     # Если сессия пересекает полночь в локальном времени (например, 22:00 - 02:00)
     if session_def.local_end_time < session_def.local_start_time:
-        local_end_dt_naive = datetime.combine(target_date + timedelta(days=1), session_def.local_end_time)
+        local_end_dt_naive = datetime.combine(target_date + ONE_DAY, session_def.local_end_time)
     else:
         local_end_dt_naive = datetime.combine(target_date, session_def.local_end_time)
     
@@ -59,39 +88,190 @@ def get_utc_session_boundaries_for_date(
 
     return start_utc_dt, end_utc_dt
 
-# --- Примеры определений сессий --- 
+def _time_to_timedelta(t: time) -> pd.Timedelta:
+    return pd.Timedelta(hours=t.hour, minutes=t.minute, seconds=t.second, microseconds=t.microsecond)
+
+def _fixed_utc_offset(tz: pytz.BaseTzInfo) -> Optional[pd.Timedelta]:
+    """
+    Возвращает постоянное смещение часового пояса от UTC или None, если у зоны бывают переходы (DST и т.п.).
+    """
+    if tz is pytz.utc:
+        return pd.Timedelta(0)
+    if isinstance(tz, pytz.tzinfo.StaticTzInfo):
+        return pd.Timedelta(tz.utcoffset(None))
+    return None
+
+# Значение NaT в int64 представлении DatetimeIndex
+_NAT_NS = np.iinfo(np.int64).min
+
+def get_utc_session_boundaries_for_range(
+    session_def: SessionDefinition,
+    dates
+) -> tuple[pd.DatetimeIndex, pd.DatetimeIndex]:
+    """
+    Векторный аналог get_utc_session_boundaries_for_date для набора дат: границы всех дней
+    локализуются одним вызовом tz_localize вместо pytz.localize на каждую дату.
+
+    Args:
+        session_def: Определение сессии (SessionDefinition).
+        dates: Даты (список date/datetime или DatetimeIndex); время суток отбрасывается.
+
+    Returns:
+        Кортеж (starts_utc, ends_utc) из двух DatetimeIndex в UTC той же длины, что и dates.
+        Для дат, где время открытия/закрытия неоднозначно или не существует из-за перехода DST,
+        возвращается NaT (get_utc_session_boundaries_for_date в этом случае возбуждает исключение).
+    """
+    days = pd.DatetimeIndex(dates)
+    if days.tz is not None:
+        days = days.tz_localize(None)
+    days = days.normalize()
+
+    local_starts = days + _time_to_timedelta(session_def.local_start_time)
+    local_ends = days + _time_to_timedelta(session_def.local_end_time)
+    # Если сессия пересекает полночь в локальном времени (например, 22:00 - 02:00)
+    if session_def.local_end_time < session_def.local_start_time:
+        local_ends = local_ends + ONE_DAY
+
+    # Быстрый путь для UTC и зон с постоянным смещением (Etc/GMT±N): переходов DST нет,
+    # поэтому границы - это локальное время минус смещение, без локализации в часовом поясе биржи
+    tz = session_def._tz
+    fixed_offset = _fixed_utc_offset(tz)
+    if fixed_offset is not None:
+        return (local_starts - fixed_offset).tz_localize(pytz.utc), (local_ends - fixed_offset).tz_localize(pytz.utc)
+
+    starts_utc = local_starts.tz_localize(tz, ambiguous='NaT', nonexistent='NaT').tz_convert(pytz.utc)
+    ends_utc = local_ends.tz_localize(tz, ambiguous='NaT', nonexistent='NaT').tz_convert(pytz.utc)
+    return starts_utc, ends_utc
+
+class SessionCalendar:
+    """
+    Предрасчитанные границы сессии в UTC для каждого дня диапазона дат.
+    Границы хранятся в двух int64 массивах (наносекунды UTC), индексируемых номером дня от начала диапазона,
+    поэтому boundaries(d) - это два обращения к массивам вместо локализации pytz на каждый запрос.
+    """
+
+    def __init__(self, session_def: SessionDefinition, start_date: date, end_date: date):
+        """
+        Args:
+            session_def: Определение сессии (SessionDefinition).
+            start_date: Первая дата диапазона (включительно).
+            end_date: Последняя дата диапазона (включительно).
+        """
+        self.session_def = session_def
+        self.start_date = start_date
+        self.end_date = end_date
+        self._base_ordinal = start_date.toordinal()
+        starts_utc, ends_utc = get_utc_session_boundaries_for_range(session_def, pd.date_range(start_date, end_date, freq='D'))
+        # NaT (дни с переходом DST в момент открытия/закрытия) хранится как минимальное int64
+        self.starts_ns = starts_utc.as_unit('ns').asi8
+        self.ends_ns = ends_utc.as_unit('ns').asi8
+
+    def boundaries(self, target_date: date) -> tuple[int, int]:
+        """
+        Возвращает (start_ns, end_ns) - границы сессии за target_date в наносекундах UTC.
+        Возбуждает KeyError для даты вне диапазона календаря и ValueError, если время открытия/закрытия
+        неоднозначно или не существует из-за перехода DST (как get_utc_session_boundaries_for_date).
+        """
+        position = target_date.toordinal() - self._base_ordinal
+        if position < 0 or position >= len(self.starts_ns):
+            raise KeyError(f"Дата {target_date} вне календаря {self.start_date} - {self.end_date} для сессии {self.session_def.name}")
+        start_ns = int(self.starts_ns[position])
+        end_ns = int(self.ends_ns[position])
+        if start_ns == _NAT_NS or end_ns == _NAT_NS:
+            raise ValueError(f"Неоднозначное или несуществующее время сессии {self.session_def.name} на {target_date} из-за перехода DST")
+        return start_ns, end_ns
+
+def session_mask(
+    index: pd.DatetimeIndex,
+    session_def: SessionDefinition,
+    target_date: date
+) -> np.ndarray:
+    """
+    Булева маска свечей index, попадающих в сессию session_def за дату target_date.
+    Сравнение идет по int64 наносекундам индекса (asi8), без поэлементной работы с tz-aware метками.
+    Обе границы сессии включаются, как в SessionAnalyzer.
+
+    Args:
+        index: DatetimeIndex свечей; наивный индекс считается заданным в UTC.
+        session_def: Определение сессии (SessionDefinition).
+        target_date: Дата сессии.
+
+    Returns:
+        numpy массив bool длины len(index).
+    """
+    start_utc, end_utc = get_utc_session_boundaries_for_date(session_def, target_date)
+    values = index.as_unit('ns').asi8
+    return (values >= pd.Timestamp(start_utc).value) & (values <= pd.Timestamp(end_utc).value)
+
+def session_slice(
+    data: pd.DataFrame,
+    session_def: SessionDefinition,
+    target_date: date
+) -> pd.DataFrame:
+    """
+    Свечи data, попадающие в сессию session_def за дату target_date, - то же, что data[session_mask(...)],
+    но для отсортированного индекса: границы находятся двоичным поиском (np.searchsorted) по asi8,
+    а результат - срез iloc без построения маски по всему индексу.
+
+    Args:
+        data: DataFrame свечей с отсортированным по возрастанию DatetimeIndex; наивный индекс считается заданным в UTC.
+        session_def: Определение сессии (SessionDefinition).
+        target_date: Дата сессии.
+
+    Returns:
+        DataFrame со свечами сессии (обе границы включаются).
+    """
+    start_utc, end_utc = get_utc_session_boundaries_for_date(session_def, target_date)
+    values = data.index.as_unit('ns').asi8
+    lo = np.searchsorted(values, pd.Timestamp(start_utc).value, side='left')
+    hi = np.searchsorted(values, pd.Timestamp(end_utc).value, side='right')
+    return data.iloc[lo:hi]
+
+# Файл с определениями сессий по умолчанию: ключ -> поля SessionDefinition, время в формате "HH:MM"
+DEFAULT_SESSIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.json")
+
+def load_sessions(path: str = DEFAULT_SESSIONS_PATH) -> Mapping[str, SessionDefinition]:
+    """
+    Загружает определения сессий из JSON-файла.
+
+    Args:
+        path: Путь к JSON-файлу вида {"ключ": {"name": ..., "exchange_timezone": ...,
+              "local_start_time": "HH:MM", "local_end_time": "HH:MM", "description": ...}}.
+
+    Returns:
+        Неизменяемый словарь (MappingProxyType) {ключ: SessionDefinition}.
+        Возбуждает ValueError при неизвестном часовом поясе или неверном формате времени.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        raw_sessions = json.load(f)
+
+    sessions = {}
+    for key, fields in raw_sessions.items():
+        fields = dict(fields)
+        fields['local_start_time'] = time.fromisoformat(fields['local_start_time'])
+        fields['local_end_time'] = time.fromisoformat(fields['local_end_time'])
+        sessions[key] = SessionDefinition(**fields)
+    return MappingProxyType(sessions)
+
+# --- Определения сессий ---
+
+# Реестр сессий для быстрого доступа по ключу; читается из sessions.json один раз при импорте модуля
+# и доступен только для чтения. Константы ниже - ссылки на записи реестра.
+SUPPORTED_SESSIONS = load_sessions()
 
 # Xetra (Франкфурт) для GER40/DAX
 # Часы работы: 09:00 - 17:30 Europe/Berlin (включая аукционы)
 # Основная торговля: 09:00 - 17:30 CET/CEST. Фьючерсы торгуются дольше.
 # Для простоты берем основные часы.
-XETRA_FRANKFURT_SESSION = SessionDefinition(
-    name="Frankfurt_Xetra_Main",
-    exchange_timezone="Europe/Berlin",
-    local_start_time=time(9, 0),
-    local_end_time=time(17, 30),
-    description="Основные торговые часы Xetra (DAX/GER40)"
-)
+XETRA_FRANKFURT_SESSION = SUPPORTED_SESSIONS["frankfurt_xetra"]
 
 # London Stock Exchange (LSE)
 # Часы работы: 08:00 - 16:30 Europe/London
-LSE_LONDON_SESSION = SessionDefinition(
-    name="London_LSE_Main",
-    exchange_timezone="Europe/London",
-    local_start_time=time(8, 0),
-    local_end_time=time(16, 30),
-    description="Основные торговые часы London Stock Exchange"
-)
+LSE_LONDON_SESSION = SUPPORTED_SESSIONS["london_lse"]
 
 # New York Stock Exchange (NYSE)
 # Часы работы: 09:30 - 16:00 America/New_York
-NYSE_NEWYORK_SESSION = SessionDefinition(
-    name="NewYork_NYSE_Main",
-    exchange_timezone="America/New_York",
-    local_start_time=time(9, 30),
-    local_end_time=time(16, 0),
-    description="Основные торговые часы New York Stock Exchange"
-)
+NYSE_NEWYORK_SESSION = SUPPORTED_SESSIONS["newyork_nyse"]
 
 # Условная "Азиатская сессия" - можно определить как некий общий диапазон UTC,
 # так как "Азия" - это много разных бирж с разным временем.
@@ -99,46 +279,18 @@ NYSE_NEWYORK_SESSION = SessionDefinition(
 # Tokyo Stock Exchange (TSE): 09:00-11:30, 12:30-15:00 Asia/Tokyo
 # Здесь для примера оставим обобщенную UTC-сессию, если она нужна для каких-то широких оценок.
 # Но для точности лучше использовать конкретные биржи.
-ASIA_GENERIC_UTC_SESSION = SessionDefinition(
-    name="Asia_Generic_UTC",
-    exchange_timezone="UTC", # Указываем UTC как таймзону
-    local_start_time=time(0, 0), # 00:00 UTC
-    local_end_time=time(9, 0),   # 09:00 UTC
-    description="Обобщенная Азиатская сессия в UTC (00:00-09:00 UTC)"
-)
+ASIA_GENERIC_UTC_SESSION = SUPPORTED_SESSIONS["asia_generic_utc"]
 
 # Пример для Токийской биржи (с перерывом, который здесь не учитывается в одной сессии)
 # Чтобы учесть перерыв, нужно будет определять две сессии или усложнять логику.
-TSE_TOKYO_MORNING_SESSION = SessionDefinition(
-    name="Tokyo_TSE_Morning",
-    exchange_timezone="Asia/Tokyo",
-    local_start_time=time(9,0),
-    local_end_time=time(11,30)
-)
-TSE_TOKYO_AFTERNOON_SESSION = SessionDefinition(
-    name="Tokyo_TSE_Afternoon",
-    exchange_timezone="Asia/Tokyo",
-    local_start_time=time(12,30),
-    local_end_time=time(15,0)
-)
-
-# Словарь для быстрого доступа к определениям сессий
-SUPPORTED_SESSIONS = {
-    "frankfurt_xetra": XETRA_FRANKFURT_SESSION,
-    "london_lse": LSE_LONDON_SESSION,
-    "newyork_nyse": NYSE_NEWYORK_SESSION,
-    "asia_generic_utc": ASIA_GENERIC_UTC_SESSION,
-    "tokyo_morning": TSE_TOKYO_MORNING_SESSION,
-    "tokyo_afternoon": TSE_TOKYO_AFTERNOON_SESSION,
-}
+TSE_TOKYO_MORNING_SESSION = SUPPORTED_SESSIONS["tokyo_morning"]
+TSE_TOKYO_AFTERNOON_SESSION = SUPPORTED_SESSIONS["tokyo_afternoon"]
 
 # TODO (из предыдущей версии, актуализировано):
 # 1. Учет праздников для бирж: get_utc_session_boundaries_for_date сейчас не знает о праздниках.
 #    Это потребует источника данных о праздниках (например, библиотека `holidays` или API).
 # 2. Более сложная обработка перерывов в торговле (как у TSE_TOKYO) в SessionAnalyzer.
 #    Текущий SessionAnalyzer обрабатывает одну непрерывную сессию за день.
-# 3. Управление конфигурацией сессий: вынести определения сессий (SUPPORTED_SESSIONS)
-#    в отдельный конфигурационный файл (JSON, YAML) для гибкости.
 
 
 # --- Пример использования функции get_utc_session_boundaries_for_date ---
@@ -1,16 +1,143 @@
 import yfinance as yf
+from yfinance.exceptions import YFTickerMissingError
 import pandas as pd
-from datetime import datetime
-from src.core.data_source import DataSource
+from datetime import datetime, date, timedelta
+import os
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Iterable
+from src.core.data_source import DataSource, DataSourceError
+from src.core.storage import DEFAULT_CACHE_TTL_DAYS, PARQUET_WRITE_OPTIONS, apply_price_dtype
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Общий пустой результат с колонками OHLCV. Наружу отдается через _empty_result() поверхностной копией:
+# при Copy-on-Write она не копирует данные, а изменение колонок у вызывающего кода не затронет образец.
+_EMPTY_DF = pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
+
+def _empty_result() -> pd.DataFrame:
+    """Пустой DataFrame с колонками OHLCV для случаев ошибки или отсутствия данных."""
+    return _EMPTY_DF.copy(deep=False)
+
 class YahooFinanceConnector(DataSource):
     """
     Коннектор для загрузки данных с Yahoo Finance.
     """
 
+    # Колонки OHLCV результата: список для выбора колонок и frozenset для проверки их наличия,
+    # создаются один раз на класс, а не при каждом запросе
+    _REQUIRED_LIST = ['Open', 'High', 'Low', 'Close', 'Volume']
+    _REQUIRED = frozenset(_REQUIRED_LIST)
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        naive_utc_index: bool = False,
+        price_dtype: Optional[str] = None,
+        cache_ttl_days: Optional[int] = DEFAULT_CACHE_TTL_DAYS
+    ):
+        """
+        Args:
+            cache_dir: Директория parquet-кэша ответов Yahoo Finance по точному ключу (symbol, interval, start, end).
+                       None (по умолчанию) - без кэша: при работе через DataManager данные кэширует он,
+                       кэш коннектора нужен при прямом использовании fetch_data/fetch_data_batch.
+            naive_utc_index: Если True, индекс внутридневных данных (интервалы в минутах/часах) переводится
+                             в UTC и делается наивным (datetime64 без tz, подразумевается UTC): векторные операции
+                             над наивным индексом идут по быстрому пути без обработки часового пояса.
+                             Дневные и более крупные свечи остаются в часовом поясе биржи - их метки означают
+                             даты, и перевод в UTC сдвинул бы их на соседний день. DataManager в этом режиме
+                             режет запрошенные дни по UTC, а не по локальной дате биржи.
+            price_dtype: Тип ценовых колонок Open/High/Low/Close в результатах, например 'float32' (как у DataManager).
+                         float32 вдвое уменьшает объем данных для последующих вычислений, но хранит только
+                         ~7 значащих цифр: для валютных пар с 5 знаками после запятой лучше оставить None (float64).
+                         Кэш коннектора всегда хранит исходные float64, приведение выполняется при возврате.
+            cache_ttl_days: Срок жизни файла кэша в днях (по времени изменения файла), как у DataManager:
+                            скорректированные цены меняются задним числом после дивидендов и сплитов,
+                            поэтому более старые файлы загружаются заново. None - кэш не устаревает.
+        """
+        self.cache_dir = cache_dir
+        self.naive_utc_index = naive_utc_index
+        self.price_dtype = price_dtype
+        self.cache_ttl_days = cache_ttl_days
+        # Объекты yf.Ticker по символу: fetch_data и get_info для одного символа используют один объект
+        self._tickers: dict[str, yf.Ticker] = {}
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __getstate__(self) -> dict:
+        # yf.Ticker содержит threading.local и не сериализуется pickle, а коннектор передается
+        # в процессы-воркеры вместе с DataManager (SessionAnalyzer.batch_daily_session_analysis).
+        # Объекты Ticker в копию не попадают, воркер создаст свои при первом обращении.
+        state = self.__dict__.copy()
+        state['_tickers'] = {}
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._tickers = {}
+
+    def _ticker(self, symbol: str) -> yf.Ticker:
+        """Возвращает yf.Ticker для символа, создавая его при первом обращении."""
+        ticker = self._tickers.get(symbol)
+        if ticker is None:
+            # setdefault атомарен под GIL: при одновременном первом обращении из fetch_many все потоки получат один объект
+            ticker = self._tickers.setdefault(symbol, yf.Ticker(symbol))
+        return ticker
+
+    def _cache_path(self, symbol: str, start_date: datetime, end_date: datetime, interval: str) -> Optional[str]:
+        """Путь к файлу кэша для запроса или None, если кэш отключен."""
+        if self.cache_dir is None:
+            return None
+        key = hashlib.blake2b(f"{symbol}|{interval}|{start_date:%Y%m%d}|{end_date:%Y%m%d}".encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.parquet")
+
+    def _read_cache(self, cache_path: Optional[str]) -> Optional[pd.DataFrame]:
+        """Читает ответ из кэша; None, если кэша нет, он старше cache_ttl_days или файл не читается."""
+        if cache_path is None or not os.path.exists(cache_path):
+            return None
+        if self.cache_ttl_days is not None and time.time() - os.path.getmtime(cache_path) > self.cache_ttl_days * 86400:
+            logger.info(f"Yahoo Finance cache file {cache_path} is older than {self.cache_ttl_days} days. Refreshing.")
+            return None
+        try:
+            return pd.read_parquet(cache_path)
+        except Exception as e:
+            logger.warning(f"Error reading Yahoo Finance cache file {cache_path}: {e}. Fetching from source.")
+            return None
+
+    @staticmethod
+    def _write_cache(cache_path: Optional[str], data: pd.DataFrame, end_date: datetime) -> None:
+        """
+        Сохраняет ответ в кэш. Диапазоны, включающие сегодняшний день, не кэшируются:
+        данные за текущий день еще могут измениться.
+        """
+        if cache_path is None or data.empty or end_date.date() > date.today():
+            return
+        try:
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            data.to_parquet(tmp_path, **PARQUET_WRITE_OPTIONS)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.error(f"Error saving Yahoo Finance cache file {cache_path}: {e}")
+
+    def _normalize_index(self, data: pd.DataFrame, interval: str) -> pd.DataFrame:
+        """Переводит индекс внутридневных данных в наивный UTC, если включен naive_utc_index."""
+        if not self.naive_utc_index or data.empty or data.index.tz is None or not interval.endswith(('m', 'h')):
+            return data
+        data = data.copy(deep=False)
+        data.index = data.index.tz_convert('UTC').tz_localize(None)
+        return data
+
+    def _prepare_result(self, data: pd.DataFrame, interval: str) -> pd.DataFrame:
+        """Приводит ответ к формату коннектора: индекс по naive_utc_index, ценовые колонки к price_dtype."""
+        return apply_price_dtype(self._normalize_index(data, interval), self.price_dtype)
+
+    @staticmethod
+    def _as_date(value: datetime) -> date:
+        """Дата без времени для yfinance, без форматирования в строку и обратного разбора."""
+        return value.date() if isinstance(value, datetime) else value
+
     def fetch_data(
         self,
         symbol: str,
@@ -33,55 +160,254 @@ class YahooFinanceConnector(DataSource):
 
         Returns:
             pandas.DataFrame с колонками [Open, High, Low, Close, Volume] и DatetimeIndex.
-            В случае ошибки или отсутствия данных возвращает пустой DataFrame.
+            Если за период нет данных, возвращает пустой DataFrame; при ошибке загрузки
+            (сеть, ответ Yahoo без нужных колонок) возбуждает DataSourceError.
         """
+        cache_path = self._cache_path(symbol, start_date, end_date, interval)
+        cached = self._read_cache(cache_path)
+        if cached is not None:
+            logger.debug("Loading %s from Yahoo Finance cache: %s", symbol, cache_path)
+            return self._prepare_result(cached, interval)
+
         try:
-            ticker = yf.Ticker(symbol)
-            # yfinance ожидает даты в формате 'YYYY-MM-DD'
+            ticker = self._ticker(symbol)
+            # yfinance принимает date напрямую (полночь в часовом поясе биржи, как и строка 'YYYY-MM-DD').
+            # actions=False: колонки Dividends/Stock Splits не нужны, yfinance не разбирает и не присоединяет их.
+            # raise_errors=True: иначе yfinance при сетевой ошибке только пишет в лог и возвращает пустой DataFrame,
+            # неотличимый от периода без данных
             data = ticker.history(
-                start=start_date.strftime('%Y-%m-%d'),
-                end=end_date.strftime('%Y-%m-%d'),
-                interval=interval
+                start=self._as_date(start_date),
+                end=self._as_date(end_date),
+                interval=interval,
+                actions=False,
+                raise_errors=True
             )
-            if data.empty:
-                logger.warning(f"No data found for symbol {symbol} from {start_date} to {end_date} with interval {interval}.")
-                return pd.DataFrame()
-            
-            # yfinance может возвращать дивиденды и сплиты, нам нужны только OHLCV
-            # Также проверим, что необходимые колонки существуют
-            required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-            if not all(col in data.columns for col in required_columns):
-                logger.error(f"Missing required columns for symbol {symbol}. Available columns: {data.columns.tolist()}")
-                return pd.DataFrame()
-                
-            return data[required_columns]
+        except YFTickerMissingError as e:
+            # Yahoo ответил, что цен за период нет (или тикер не найден) - это не ошибка загрузки
+            logger.warning(f"No data found for symbol {symbol} from {start_date} to {end_date} with interval {interval}: {e}")
+            return _empty_result()
         except Exception as e:
             logger.error(f"Error fetching data for symbol {symbol} from Yahoo Finance: {e}")
-            return pd.DataFrame()
+            raise DataSourceError(f"Error fetching data for symbol {symbol} from Yahoo Finance: {e}") from e
+
+        if data.shape[0] == 0:
+            logger.warning(f"No data found for symbol {symbol} from {start_date} to {end_date} with interval {interval}.")
+            return _empty_result()
+
+        # yfinance может возвращать дивиденды и сплиты, нам нужны только OHLCV
+        # Также проверим, что необходимые колонки существуют
+        missing_columns = self._REQUIRED.difference(data.columns)
+        if missing_columns:
+            logger.error(f"Missing required columns {sorted(missing_columns)} for symbol {symbol}. Available columns: {data.columns.tolist()}")
+            raise DataSourceError(f"Missing required columns {sorted(missing_columns)} for symbol {symbol}")
+
+        # При actions=False ответ обычно уже содержит ровно OHLCV; иначе выбираем колонки.
+        # При Copy-on-Write (pandas >= 3) выбор колонок не копирует данные: блоки общие, пока их не изменят
+        if data.columns.tolist() != self._REQUIRED_LIST:
+            data = data[self._REQUIRED_LIST]
+        self._write_cache(cache_path, data, end_date)
+        return self._prepare_result(data, interval)
+
+    def fetch_data_batch(
+        self,
+        symbols: list[str],
+        start_date: datetime,
+        end_date: datetime,
+        interval: str = "1d"
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Загружает исторические данные (OHLCV) сразу для нескольких символов одним вызовом yf.download:
+        запросы выполняются пулом потоков yfinance, а не последовательно по одному Ticker.history на символ.
+
+        Args:
+            symbols: Список тикеров.
+            start_date: Начальная дата периода.
+            end_date: Конечная дата периода.
+            interval: Временной интервал свечей (как в fetch_data).
+
+        Returns:
+            Словарь {symbol: DataFrame} в формате fetch_data; для символов без данных - пустой DataFrame.
+        """
+        if not symbols:
+            return {}
+
+        # Из сети загружаются только символы, которых нет в кэше
+        results = {}
+        cache_paths = {}
+        for symbol in symbols:
+            cache_paths[symbol] = self._cache_path(symbol, start_date, end_date, interval)
+            cached = self._read_cache(cache_paths[symbol])
+            if cached is not None:
+                results[symbol] = cached
+        symbols_to_fetch = [symbol for symbol in symbols if symbol not in results]
+        if not symbols_to_fetch:
+            return {symbol: self._prepare_result(results[symbol], interval) for symbol in symbols}
+
+        try:
+            # auto_adjust=True и ignore_tz=False - как у Ticker.history: скорректированные цены
+            # и индекс в часовом поясе биржи
+            data = yf.download(
+                tickers=" ".join(symbols_to_fetch),
+                start=self._as_date(start_date),
+                end=self._as_date(end_date),
+                interval=interval,
+                group_by="ticker",
+                auto_adjust=True,
+                ignore_tz=False,
+                threads=True,
+                progress=False,
+                multi_level_index=True
+            )
+        except Exception as e:
+            logger.error(f"Error fetching batch data for symbols {symbols_to_fetch} from Yahoo Finance: {e}")
+            results.update({symbol: _empty_result() for symbol in symbols_to_fetch})
+            return {symbol: self._prepare_result(results[symbol], interval) for symbol in symbols}
+
+        downloaded = set(data.columns.get_level_values(0)) if data is not None and not data.empty else set()
+        for symbol in symbols_to_fetch:
+            # yfinance приводит тикеры к верхнему регистру
+            key = symbol if symbol in downloaded else symbol.upper()
+            if key not in downloaded:
+                logger.warning(f"No data found for symbol {symbol} from {start_date} to {end_date} with interval {interval}.")
+                results[symbol] = _empty_result()
+                continue
 
-    def get_info(self, symbol: str) -> dict:
+            # Индекс общий для всех символов пакета: строки, где у символа нет ни одного значения, убираем
+            symbol_data = data[key].dropna(how='all').rename_axis(columns=None)
+            if symbol_data.shape[0] == 0:
+                logger.warning(f"No data found for symbol {symbol} from {start_date} to {end_date} with interval {interval}.")
+                results[symbol] = _empty_result()
+            elif not self._REQUIRED.issubset(symbol_data.columns):
+                logger.error(f"Missing required columns {sorted(self._REQUIRED.difference(symbol_data.columns))} for symbol {symbol}. Available columns: {symbol_data.columns.tolist()}")
+                results[symbol] = _empty_result()
+            else:
+                results[symbol] = symbol_data[self._REQUIRED_LIST]
+                self._write_cache(cache_paths[symbol], results[symbol], end_date)
+        return {symbol: self._prepare_result(results[symbol], interval) for symbol in symbols}
+
+    def fetch_many(
+        self,
+        symbols: list[str],
+        start_date: datetime,
+        end_date: datetime,
+        interval: str = "1d",
+        max_workers: int = 16
+    ) -> dict[str, pd.DataFrame]:
+        """
+        Загружает данные для нескольких символов отдельными fetch_data в пуле потоков, чтобы сетевые
+        задержки запросов перекрывались. Альтернатива fetch_data_batch для случаев, когда пакетный
+        yf.download работает ненадежно (отдельные интервалы или классы инструментов).
+
+        Args:
+            symbols: Список тикеров.
+            start_date: Начальная дата периода.
+            end_date: Конечная дата периода.
+            interval: Временной интервал свечей (как в fetch_data).
+            max_workers: Максимальное количество потоков.
+
+        Returns:
+            Словарь {symbol: DataFrame} в формате fetch_data; ошибка по одному символу дает пустой DataFrame.
+        """
+        if not symbols:
+            return {}
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as executor:
+            futures = {
+                executor.submit(self.fetch_data, symbol, start_date, end_date, interval): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    results[symbol] = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching data for symbol {symbol} from Yahoo Finance: {e}")
+                    results[symbol] = _empty_result()
+        return {symbol: results[symbol] for symbol in symbols}
+
+    def get_info(self, symbol: str, fields: Optional[Iterable[str]] = None) -> dict:
         """
         Возвращает информацию об инструменте с Yahoo Finance.
 
         Args:
             symbol: Тикер инструмента.
+            fields: Нужные поля (например, ['currency', 'lastPrice', 'marketCap']). Если все они есть
+                    в Ticker.fast_info, полный ответ quoteSummary не загружается. None - весь словарь ticker.info.
 
         Returns:
-            Словарь с информацией об инструменте или пустой словарь в случае ошибки.
+            Словарь с информацией об инструменте (при заданном fields - только с этими полями)
+            или пустой словарь в случае ошибки.
         """
         try:
-            ticker = yf.Ticker(symbol)
+            ticker = self._ticker(symbol)
+            if fields is not None:
+                fields = list(fields)
+                fast_info = ticker.fast_info
+                # keys() у fast_info не обращается к сети, значения загружаются только по запрошенным полям
+                if set(fields).issubset(fast_info.keys()):
+                    return {field: fast_info[field] for field in fields}
+
             info = ticker.info
             if not info or (isinstance(info, dict) and info.get('regularMarketPrice') is None and info.get('previousClose') is None):
                 # ticker.info может вернуть {'regularMarketPrice': None, 'preMarketPrice': None, ...} для невалидных тикеров
                 # или если нет данных. Проверяем наличие ключевых полей.
                 logger.warning(f"Could not retrieve valid info for symbol {symbol} from Yahoo Finance. It might be an invalid ticker.")
                 return {}
+            if fields is not None:
+                return {field: info.get(field) for field in fields}
             return info
         except Exception as e:
             logger.error(f"Error fetching info for symbol {symbol} from Yahoo Finance: {e}")
             return {}
 
+    def earliest_available_date(self, symbol: str) -> Optional[date]:
+        """
+        Возвращает дату первой дневной свечи символа на Yahoo Finance (начало доступной истории),
+        чтобы загружать полную историю без угадывания начальной даты.
+
+        Сначала используется firstTradeDate из метаданных истории (один короткий запрос). Если его нет,
+        дата ищется двоичным поиском по коротким пробным запросам истории: O(log лет) запросов вместо
+        загрузки всего диапазона. Окно пробы - две недели, чтобы выходные и праздники не давали
+        ложных пустых ответов.
+
+        Args:
+            symbol: Тикер инструмента.
+
+        Returns:
+            Дата первой свечи (в часовом поясе биржи) или None, если данных по символу нет.
+        """
+        ticker = self._ticker(symbol)
+        try:
+            first_trade = ticker.get_history_metadata().get('firstTradeDate')
+            if first_trade is not None:
+                # Отформатированные метаданные содержат Timestamp в часовом поясе биржи, сырые - секунды epoch
+                if isinstance(first_trade, (int, float)):
+                    first_trade = pd.Timestamp(first_trade, unit='s', tz='UTC')
+                return first_trade.date()
+        except Exception as e:
+            logger.warning(f"Could not read history metadata for symbol {symbol} from Yahoo Finance: {e}. Falling back to probing.")
+
+        probe_window = timedelta(days=14)
+        lo = date(1900, 1, 1)
+        hi = date.today() + probe_window
+        found = False
+        # Инвариант: в [lo, начало первой свечи) данных нет, hi - дата самой ранней найденной свечи
+        while lo < hi:
+            mid = lo + (hi - lo) // 2
+            probe_end = min(mid + probe_window, hi)
+            try:
+                probe = ticker.history(start=mid, end=probe_end, interval="1d", actions=False)
+            except Exception as e:
+                logger.error(f"Error probing history for symbol {symbol} from Yahoo Finance: {e}")
+                return None
+            if probe.shape[0] > 0:
+                hi = probe.index[0].date()
+                found = True
+            else:
+                lo = probe_end
+        return hi if found else None
+
     def get_available_symbols(self) -> list[str]:
         """
         Yahoo Finance не предоставляет прямого способа получить список всех доступных символов через yfinance.
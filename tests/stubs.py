@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from src.core.data_source import DataSource, DataSourceError
+
+
+class StubDataSource(DataSource):
+    """
+    Источник с почасовыми свечами в часовом поясе биржи; запоминает запрошенные диапазоны.
+    skip_weekends - без свечей по выходным; fail - каждый запрос завершается DataSourceError.
+    """
+
+    def __init__(self, tz: str = 'America/New_York', skip_weekends: bool = False, fail: bool = False):
+        self.tz = tz
+        self.skip_weekends = skip_weekends
+        self.fail = fail
+        self.calls = []
+
+    def fetch_data(self, symbol, start_date, end_date, interval="1d"):
+        self.calls.append((start_date.date(), end_date.date()))
+        if self.fail:
+            raise DataSourceError(f"Stub failure for {symbol}")
+        start = pd.Timestamp(start_date).tz_localize(self.tz)
+        end = pd.Timestamp(end_date).tz_localize(self.tz)
+        index = pd.date_range(start, end, freq='h', inclusive='left')
+        if self.skip_weekends:
+            index = index[index.dayofweek < 5]
+        # Цены зависят только от абсолютного часа свечи, поэтому пересекающиеся запросы дают одинаковые значения;
+        # среди свечей есть бычьи, медвежьи и нейтральные
+        hours = index.as_unit('ns').asi8 // 3_600_000_000_000
+        values = 100.0 + 10.0 * np.sin(hours / 7.0)
+        close = values + np.round(np.sin(hours * 1.3)) * 0.5
+        return pd.DataFrame({
+            'Open': values, 'High': np.maximum(values, close) + 1, 'Low': np.minimum(values, close) - 1, 'Close': close,
+            'Volume': (hours % 1000).astype(np.int64),
+        }, index=index)
+
+    def get_available_symbols(self):
+        return []
+
+    def get_info(self, symbol, fields=None):
+        return {}
@@ -0,0 +1,174 @@
+import json
+import pickle
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.core.data_manager import DataManager, _merge_ranges, _slice_days, _uncovered_ranges
+from tests.stubs import StubDataSource
+
+
+def test_pickle_drops_memory_cache(tmp_path):
+    manager = DataManager(StubDataSource(), cache_dir=str(tmp_path))
+    manager.get_data('AAA', datetime(2023, 1, 2), datetime(2023, 1, 10), interval='1h')
+    assert manager._mem_cache
+
+    restored = pickle.loads(pickle.dumps(manager))
+
+    assert isinstance(restored._mem_cache, OrderedDict)
+    assert len(restored._mem_cache) == 0
+    assert manager._mem_cache
+    assert restored.cache_dir == manager.cache_dir
+
+
+def test_price_dtype_does_not_change_shared_cache(tmp_path):
+    source = StubDataSource()
+    start, end = datetime(2023, 1, 2), datetime(2023, 1, 10)
+
+    float32_data = DataManager(source, cache_dir=str(tmp_path), price_dtype='float32').get_data('AAA', start, end, interval='1h')
+    default_data = DataManager(source, cache_dir=str(tmp_path)).get_data('AAA', start, end, interval='1h')
+
+    assert float32_data['Open'].dtype == np.float32
+    assert default_data['Open'].dtype == np.float64
+    assert default_data['Volume'].dtype == np.int64
+    assert len(source.calls) == 1
+    assert pd.read_parquet(tmp_path / 'AAA_1h.parquet')['Close'].dtype == np.float64
+
+
+def test_merge_ranges_joins_overlapping_and_adjacent():
+    ranges = [(date(2023, 3, 1), date(2023, 3, 5)), (date(2023, 1, 1), date(2023, 1, 10)),
+              (date(2023, 1, 10), date(2023, 1, 20)), (date(2023, 1, 15), date(2023, 2, 1))]
+
+    assert _merge_ranges(ranges) == [(date(2023, 1, 1), date(2023, 2, 1)), (date(2023, 3, 1), date(2023, 3, 5))]
+    assert _merge_ranges([]) == []
+
+
+def test_uncovered_ranges_finds_head_middle_and_tail_gaps():
+    covered = [(date(2023, 1, 5), date(2023, 1, 10)), (date(2023, 1, 15), date(2023, 1, 20))]
+
+    assert _uncovered_ranges(covered, date(2023, 1, 1), date(2023, 1, 25)) == [
+        (date(2023, 1, 1), date(2023, 1, 5)),
+        (date(2023, 1, 10), date(2023, 1, 15)),
+        (date(2023, 1, 20), date(2023, 1, 25)),
+    ]
+    assert _uncovered_ranges(covered, date(2023, 1, 6), date(2023, 1, 9)) == []
+    assert _uncovered_ranges([], date(2023, 1, 1), date(2023, 1, 2)) == [(date(2023, 1, 1), date(2023, 1, 2))]
+
+
+def test_slice_days_uses_index_timezone_and_dst_days():
+    index = pd.date_range('2023-03-10', '2023-03-15', freq='h', tz='America/New_York', inclusive='left')
+    data = pd.DataFrame({'Close': np.arange(len(index), dtype=np.float64)}, index=index)
+
+    sliced = _slice_days(data, date(2023, 3, 12), date(2023, 3, 13))
+
+    # 12 марта 2023 в Нью-Йорке переход на летнее время: в сутках 23 часа
+    assert len(sliced) == 23
+    assert sliced.index[0] == pd.Timestamp('2023-03-12 00:00', tz='America/New_York')
+    assert sliced.index[-1] == pd.Timestamp('2023-03-12 23:00', tz='America/New_York')
+
+    naive = data.tz_localize(None)
+    assert len(_slice_days(naive, date(2023, 3, 11), date(2023, 3, 12))) == 24
+
+
+def test_get_data_fetches_only_uncovered_ranges(tmp_path):
+    source = StubDataSource()
+    manager = DataManager(source, cache_dir=str(tmp_path))
+
+    first = manager.get_data('AAA', datetime(2023, 1, 5), datetime(2023, 1, 10), interval='1h')
+    second = manager.get_data('AAA', datetime(2023, 1, 1), datetime(2023, 1, 15), interval='1h')
+    third = manager.get_data('AAA', datetime(2023, 1, 6), datetime(2023, 1, 12), interval='1h', columns=['Close'])
+
+    assert source.calls == [
+        (date(2023, 1, 5), date(2023, 1, 10)),
+        (date(2023, 1, 1), date(2023, 1, 5)),
+        (date(2023, 1, 10), date(2023, 1, 15)),
+    ]
+    assert len(first) == 5 * 24
+    assert len(second) == 14 * 24
+    assert second.index.is_monotonic_increasing and second.index.is_unique
+    assert third.columns.tolist() == ['Close']
+    assert third.index[0] == pd.Timestamp('2023-01-06', tz='America/New_York')
+    assert len(third) == 6 * 24
+
+    with open(tmp_path / 'AAA_1h.manifest.json', encoding='utf-8') as f:
+        assert json.load(f)['ranges'] == [['2023-01-01', '2023-01-15']]
+
+
+def test_get_data_force_refresh_refetches_requested_range(tmp_path):
+    source = StubDataSource()
+    manager = DataManager(source, cache_dir=str(tmp_path))
+    manager.get_data('AAA', datetime(2023, 1, 1), datetime(2023, 1, 15), interval='1h')
+
+    refreshed = manager.get_data('AAA', datetime(2023, 1, 5), datetime(2023, 1, 8), interval='1h', force_refresh=True)
+    whole = manager.get_data('AAA', datetime(2023, 1, 1), datetime(2023, 1, 15), interval='1h')
+
+    assert source.calls[1:] == [(date(2023, 1, 5), date(2023, 1, 8))]
+    assert len(refreshed) == 3 * 24
+    assert len(whole) == 14 * 24 and whole.index.is_unique
+
+
+def test_get_data_does_not_mark_today_as_covered(tmp_path):
+    source = StubDataSource()
+    manager = DataManager(source, cache_dir=str(tmp_path))
+    today = date.today()
+    start = datetime.combine(today - timedelta(days=3), time())
+    end = datetime.combine(today + timedelta(days=1), time())
+
+    manager.get_data('AAA', start, end, interval='1h')
+    manager.get_data('AAA', start, end, interval='1h')
+
+    assert source.calls == [(start.date(), end.date()), (today, end.date())]
+
+
+def test_get_data_refetches_cache_older_than_ttl(tmp_path):
+    source = StubDataSource()
+    manager = DataManager(source, cache_dir=str(tmp_path), cache_ttl_days=10)
+    manager.get_data('AAA', datetime(2023, 1, 1), datetime(2023, 1, 5), interval='1h')
+
+    manifest_path = tmp_path / 'AAA_1h.manifest.json'
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest['created'] = (date.today() - timedelta(days=11)).isoformat()
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    manager.get_data('AAA', datetime(2023, 1, 1), datetime(2023, 1, 5), interval='1h')
+
+    assert source.calls == [(date(2023, 1, 1), date(2023, 1, 5))] * 2
+
+
+def test_get_data_records_empty_ranges_as_covered(tmp_path):
+    source = StubDataSource(skip_weekends=True)
+    manager = DataManager(source, cache_dir=str(tmp_path))
+    # 2023-01-07 и 2023-01-08 - суббота и воскресенье
+    manager.get_data('AAA', datetime(2023, 1, 2), datetime(2023, 1, 7), interval='1h')
+
+    for _ in range(3):
+        data = manager.get_data('AAA', datetime(2023, 1, 2), datetime(2023, 1, 9), interval='1h')
+
+    assert source.calls == [(date(2023, 1, 2), date(2023, 1, 7)), (date(2023, 1, 7), date(2023, 1, 9))]
+    assert len(data) == 5 * 24
+    with open(tmp_path / 'AAA_1h.manifest.json', encoding='utf-8') as f:
+        assert json.load(f)['ranges'] == [['2023-01-02', '2023-01-09']]
+
+
+def test_get_data_does_not_cover_failed_ranges(tmp_path):
+    source = StubDataSource()
+    manager = DataManager(source, cache_dir=str(tmp_path))
+    manager.get_data('AAA', datetime(2023, 1, 2), datetime(2023, 1, 7), interval='1h')
+
+    source.fail = True
+    for _ in range(2):
+        data = manager.get_data('AAA', datetime(2023, 1, 2), datetime(2023, 1, 9), interval='1h')
+
+    assert source.calls[1:] == [(date(2023, 1, 7), date(2023, 1, 9))] * 2
+    assert len(data) == 5 * 24
+    with open(tmp_path / 'AAA_1h.manifest.json', encoding='utf-8') as f:
+        assert json.load(f)['ranges'] == [['2023-01-02', '2023-01-07']]
+
+    source.fail = False
+    manager.get_data('AAA', datetime(2023, 1, 2), datetime(2023, 1, 9), interval='1h')
+    assert source.calls[-1] == (date(2023, 1, 7), date(2023, 1, 9))
+    assert len(source.calls) == 4
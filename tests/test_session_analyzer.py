@@ -0,0 +1,183 @@
+from datetime import datetime, time, timedelta
+
+import pandas as pd
+import pytest
+import pytz
+
+from src.analysis import session_analyzer
+from src.analysis.session_analyzer import SessionAnalyzer
+from src.core.data_manager import DataManager
+from src.core.trading_sessions import SUPPORTED_SESSIONS, SessionDefinition, get_utc_session_boundaries_for_date
+from tests.stubs import StubDataSource
+
+
+def test_market_data_cache_is_bounded_lru(tmp_path):
+    analyzer = SessionAnalyzer(DataManager(StubDataSource(), cache_dir=str(tmp_path)), market_data_cache_size=2)
+    start, end = datetime(2023, 1, 2), datetime(2023, 1, 10)
+
+    for symbol in ['AAA', 'BBB']:
+        analyzer.get_daily_session_analysis(symbol, SUPPORTED_SESSIONS['newyork_nyse'], start, end)
+    # Повторное обращение к AAA делает его самым свежим, поэтому вытесняется BBB
+    analyzer.get_daily_session_analysis('AAA', SUPPORTED_SESSIONS['london_lse'], start, end)
+    analyzer.get_daily_session_analysis('CCC', SUPPORTED_SESSIONS['newyork_nyse'], start, end)
+
+    assert [key[0] for key in analyzer._market_data_cache] == ['AAA', 'CCC']
+
+    analyzer.clear_market_data_cache('AAA')
+    assert [key[0] for key in analyzer._market_data_cache] == ['CCC']
+    analyzer.clear_market_data_cache()
+    assert len(analyzer._market_data_cache) == 0
+
+
+def test_market_data_cache_can_be_disabled(tmp_path):
+    analyzer = SessionAnalyzer(DataManager(StubDataSource(), cache_dir=str(tmp_path)), market_data_cache_size=0)
+    result = analyzer.get_daily_session_analysis(
+        'AAA', SUPPORTED_SESSIONS['newyork_nyse'], datetime(2023, 1, 2), datetime(2023, 1, 10)
+    )
+
+    assert len(result) > 0
+    assert len(analyzer._market_data_cache) == 0
+
+
+@pytest.mark.parametrize('session_key', sorted(SUPPORTED_SESSIONS))
+def test_polars_analyzer_matches_base(tmp_path, session_key):
+    pytest.importorskip('polars')
+    from src.analysis.session_analyzer_polars import PolarsSessionAnalyzer
+
+    data_manager = DataManager(StubDataSource(), cache_dir=str(tmp_path))
+    start, end = datetime(2023, 1, 2), datetime(2023, 1, 20)
+    expected = SessionAnalyzer(data_manager).get_daily_session_analysis('AAA', SUPPORTED_SESSIONS[session_key], start, end)
+    result = PolarsSessionAnalyzer(data_manager, market_data_cache_size=0).get_daily_session_analysis(
+        'AAA', SUPPORTED_SESSIONS[session_key], start, end
+    )
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_multi_session_methods_load_market_data_once(tmp_path):
+    data_manager = DataManager(StubDataSource(), cache_dir=str(tmp_path))
+    analyzer = SessionAnalyzer(data_manager, market_data_cache_size=0)
+    start, end = datetime(2023, 1, 2), datetime(2023, 1, 10)
+    session_defs = list(SUPPORTED_SESSIONS.values())
+
+    loads = []
+    get_data = data_manager.get_data
+    data_manager.get_data = lambda *args, **kwargs: loads.append(args[0]) or get_data(*args, **kwargs)
+
+    session_data = analyzer.get_session_data_multi('AAA', session_defs, start, end)
+    assert loads == ['AAA']
+    daily = analyzer.get_daily_session_analysis_multi('AAA', session_defs, start, end)
+    assert loads == ['AAA', 'AAA']
+
+    for session_def in session_defs:
+        pd.testing.assert_frame_equal(
+            session_data[session_def.name], analyzer.get_session_data('AAA', session_def, start, end)
+        )
+        pd.testing.assert_frame_equal(
+            daily[session_def.name], analyzer.get_daily_session_analysis('AAA', session_def, start, end)
+        )
+
+
+# Сессии с границей, попадающей на переход DST: 2023-03-12 02:30 в Нью-Йорке не существует,
+# 2023-11-05 01:30 - неоднозначно; такие дни анализатор пропускает, как и per-date расчет
+DST_TEST_SESSIONS = list(SUPPORTED_SESSIONS.values()) + [
+    SessionDefinition("NY_Night_Nonexistent", "America/New_York", time(2, 30), time(8, 0)),
+    SessionDefinition("NY_Night_Ambiguous", "America/New_York", time(1, 30), time(6, 0)),
+    SessionDefinition("Berlin_Overnight", "Europe/Berlin", time(22, 0), time(2, 0)),
+]
+# Периоды с переходами DST: март (США 12.03, Европа 26.03) и осень (Европа 29.10, США 05.11)
+DST_TEST_PERIODS = [
+    (datetime(2023, 3, 8), datetime(2023, 3, 28)),
+    (datetime(2023, 10, 26), datetime(2023, 11, 8)),
+]
+
+
+def _reference_session_candles(market_data, session_def, start_date_dt, end_date_dt):
+    """Свечи сессии по дням, найденные отдельным расчетом границ для каждой даты (как до векторизации)."""
+    utc_data = market_data.tz_convert(pytz.utc)
+    candles_by_day = []
+    day = start_date_dt.date()
+    while day <= end_date_dt.date():
+        try:
+            start_utc, end_utc = get_utc_session_boundaries_for_date(session_def, day)
+        except (pytz.exceptions.AmbiguousTimeError, pytz.exceptions.NonExistentTimeError):
+            day += timedelta(days=1)
+            continue
+        candles = utc_data[(utc_data.index >= start_utc) & (utc_data.index <= end_utc)]
+        if len(candles) > 0:
+            candles_by_day.append((day, candles))
+        day += timedelta(days=1)
+    return candles_by_day
+
+
+def _reference_daily_analysis(candles_by_day, session_def):
+    rows = []
+    for day, candles in candles_by_day:
+        session_open, session_close = candles['Open'].iloc[0], candles['Close'].iloc[-1]
+        diff = candles['Close'] - candles['Open']
+        rows.append({
+            'Date': pd.Timestamp(day),
+            'SessionName': session_def.name,
+            'Trend': 'bullish' if session_close > session_open else 'bearish' if session_close < session_open else 'flat',
+            'SessionOpen': session_open,
+            'SessionClose': session_close,
+            'SessionHigh': candles['High'].max(),
+            'SessionLow': candles['Low'].min(),
+            'BullishCandles': int((diff > 0).sum()),
+            'BearishCandles': int((diff < 0).sum()),
+            'NeutralCandles': int((diff == 0).sum()),
+            'TotalVolume': candles['Volume'].sum(),
+        })
+    return pd.DataFrame(rows)
+
+
+@pytest.mark.parametrize('session_def', DST_TEST_SESSIONS, ids=lambda session_def: session_def.name)
+@pytest.mark.parametrize('period', DST_TEST_PERIODS, ids=['spring', 'autumn'])
+def test_session_results_match_per_date_reference(tmp_path, session_def, period):
+    start, end = period
+    source = StubDataSource()
+    analyzer = SessionAnalyzer(DataManager(source, cache_dir=str(tmp_path)))
+    market_data = source.fetch_data('AAA', start - timedelta(days=1), end + timedelta(days=2), interval='1h')
+    candles_by_day = _reference_session_candles(
+        market_data[(market_data.index >= start.strftime('%Y-%m-%d')) & (market_data.index < end.strftime('%Y-%m-%d'))],
+        session_def, start, end
+    )
+
+    session_data = analyzer.get_session_data('AAA', session_def, start, end)
+    expected_data = pd.concat([candles for _, candles in candles_by_day])
+    pd.testing.assert_frame_equal(session_data, expected_data, check_freq=False)
+
+    daily = analyzer.get_daily_session_analysis('AAA', session_def, start, end)
+    expected_daily = _reference_daily_analysis(candles_by_day, session_def)
+    pd.testing.assert_frame_equal(
+        daily.astype({'Date': 'datetime64[ns]', 'SessionName': str, 'Trend': str}),
+        expected_daily.astype({'Date': 'datetime64[ns]'}),
+        check_dtype=False
+    )
+
+
+def test_dst_invalid_session_days_are_skipped(tmp_path):
+    analyzer = SessionAnalyzer(DataManager(StubDataSource(), cache_dir=str(tmp_path)))
+    nonexistent, ambiguous = DST_TEST_SESSIONS[-3], DST_TEST_SESSIONS[-2]
+
+    spring = analyzer.get_daily_session_analysis('AAA', nonexistent, *DST_TEST_PERIODS[0])
+    autumn = analyzer.get_daily_session_analysis('AAA', ambiguous, *DST_TEST_PERIODS[1])
+
+    assert pd.Timestamp('2023-03-12') not in set(spring['Date'])
+    assert pd.Timestamp('2023-03-13') in set(spring['Date'])
+    assert pd.Timestamp('2023-11-05') not in set(autumn['Date'])
+    assert pd.Timestamp('2023-11-06') in set(autumn['Date'])
+
+
+@pytest.mark.parametrize('session_def', DST_TEST_SESSIONS, ids=lambda session_def: session_def.name)
+def test_daily_analysis_same_with_and_without_numba(tmp_path, monkeypatch, session_def):
+    analyzer = SessionAnalyzer(DataManager(StubDataSource(), cache_dir=str(tmp_path)))
+    start, end = DST_TEST_PERIODS[0]
+
+    monkeypatch.setattr(session_analyzer, 'NUMBA_AVAILABLE', True)
+    with_numba = analyzer.get_daily_session_analysis('AAA', session_def, start, end)
+    monkeypatch.setattr(session_analyzer, 'NUMBA_AVAILABLE', False)
+    without_numba = analyzer.get_daily_session_analysis('AAA', session_def, start, end)
+
+    assert len(with_numba) > 0
+    pd.testing.assert_frame_equal(with_numba, without_numba)
@@ -0,0 +1,64 @@
+import os
+import pickle
+import time
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from yfinance.exceptions import YFPricesMissingError
+
+from src.core.data_source import DataSourceError
+from src.data_ingestion.yahoo_finance_connector import YahooFinanceConnector
+
+
+def test_connector_pickles_after_ticker_use():
+    connector = YahooFinanceConnector(price_dtype='float32')
+    # yf.Ticker создается без обращения к сети
+    connector._ticker('AAA')
+    assert connector._tickers
+
+    restored = pickle.loads(pickle.dumps(connector))
+
+    assert restored._tickers == {}
+    assert restored.price_dtype == 'float32'
+    # Исходный коннектор свои объекты Ticker сохраняет
+    assert 'AAA' in connector._tickers
+    assert restored._ticker('AAA') is restored._ticker('AAA')
+
+
+class _FailingTicker:
+    def __init__(self, error):
+        self.error = error
+
+    def history(self, **kwargs):
+        raise self.error
+
+
+def test_fetch_data_distinguishes_missing_prices_from_errors():
+    connector = YahooFinanceConnector()
+    start, end = datetime(2023, 1, 7), datetime(2023, 1, 9)
+
+    connector._tickers['AAA'] = _FailingTicker(YFPricesMissingError('AAA', ' (1h 2023-01-07 -> 2023-01-09)'))
+    data = connector.fetch_data('AAA', start, end, interval='1h')
+    assert data.empty
+    assert data.columns.tolist() == ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    connector._tickers['AAA'] = _FailingTicker(ConnectionError('network is unreachable'))
+    with pytest.raises(DataSourceError):
+        connector.fetch_data('AAA', start, end, interval='1h')
+
+
+def test_read_cache_expires_after_ttl(tmp_path):
+    connector = YahooFinanceConnector(cache_dir=str(tmp_path), cache_ttl_days=10)
+    cache_path = connector._cache_path('AAA', datetime(2023, 1, 2), datetime(2023, 1, 9), '1d')
+    pd.DataFrame({'Close': [1.0, 2.0]}).to_parquet(cache_path)
+
+    assert connector._read_cache(cache_path)['Close'].tolist() == [1.0, 2.0]
+
+    old = time.time() - 11 * 86400
+    os.utime(cache_path, (old, old))
+    assert connector._read_cache(cache_path) is None
+
+    # Без срока жизни кэш не устаревает
+    connector.cache_ttl_days = None
+    assert connector._read_cache(cache_path) is not None